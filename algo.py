@@ -1,9 +1,22 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import math
+import os
+import random
 import time
 from tkinter import font as tkfont
 
+import closest_pair
+from point_store import GROUP_A, GROUP_B, PointStore
+from spatial_grid import SpatialGrid
+from incremental import IncrementalClosestPair
+from background import BackgroundSolver
+from generators import LAYOUTS, generate
+from timeline import LAYERS, StepTimeline
+from raster import render_density_png
+from result_cache import PointSetFingerprint, ResultCache
+from trace_file import TraceReader, record_trace
+
 class RoundedButton(tk.Canvas):
     """Custom rounded button with hover effects"""
     def __init__(self, parent, text, command, width=100, height=35, radius=8,
@@ -30,12 +43,22 @@ class RoundedButton(tk.Canvas):
         
         self.is_hovered = False
         self.is_pressed = False
+
+        # Items are created once; state changes only restyle them
+        self.body = self.create_rounded_rect(2, 2, self.width-2, self.height-2,
+                                             self.radius, fill=bg_color, outline=bg_color)
+        # Add text with subtle shadow effect (using hex color for shadow)
+        shadow_color = "#333333"  # Dark gray for shadow
+        self.create_text(self.width//2 + 1, self.height//2 + 1,
+                        text=self.text, fill=shadow_color,
+                        font=self.font, tags="text_shadow")
+        self.create_text(self.width//2, self.height//2,
+                        text=self.text, fill=self.text_color,
+                        font=self.font, tags="text")
         self.draw_button()
     
     def draw_button(self):
-        """Draw the rounded button with current state"""
-        self.delete("all")
-        
+        """Recolor the button for its current state"""
         # Determine button color based on state
         if self.is_pressed:
             color = self.hover_color
@@ -43,19 +66,13 @@ class RoundedButton(tk.Canvas):
             color = self.hover_color
         else:
             color = self.bg_color
-        
-        # Create rounded rectangle
-        self.create_rounded_rect(2, 2, self.width-2, self.height-2, 
-                               self.radius, fill=color, outline=color)
-        
-        # Add text with subtle shadow effect (using hex color for shadow)
-        shadow_color = "#333333"  # Dark gray for shadow
-        self.create_text(self.width//2 + 1, self.height//2 + 1,
-                        text=self.text, fill=shadow_color,
-                        font=self.font, tags="text_shadow")
-        self.create_text(self.width//2, self.height//2,
-                        text=self.text, fill=self.text_color,
-                        font=self.font, tags="text")
+        self.itemconfigure(self.body, fill=color, outline=color)
+
+    def set_text(self, text):
+        """Change the button label in place"""
+        self.text = text
+        self.itemconfigure("text_shadow", text=text)
+        self.itemconfigure("text", text=text)
     
     def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
         """Create a rounded rectangle"""
@@ -101,21 +118,53 @@ class RoundedButton(tk.Canvas):
         if self.command:
             self.command()
 
-class EnhancedPoint:
-    def __init__(self, x, y, id=None):
-        self.x = x
-        self.y = y
-        self.id = id
-
-    def distance_to(self, other):
-        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
-    
-    def is_same_location(self, other, tolerance=5):
-        """Check if two points are at the same location within tolerance"""
-        return abs(self.x - other.x) < tolerance and abs(self.y - other.y) < tolerance
-
-    def __repr__(self):
-        return f"({self.x:.1f}, {self.y:.1f})"
+class CanvasPool:
+    """Canvas items created once and reused by key.
+
+    Between begin() and end() callers show() the items a frame needs:
+    known keys are moved and restyled in place with coords() and
+    itemconfigure(), new keys create an item, and end() hides every item
+    the frame did not use instead of deleting it.
+    """
+    def __init__(self, canvas, tag):
+        self.canvas = canvas
+        self.tag = tag
+        self.items = {}
+        self.shown = set()
+        self.visible = set()
+
+    def begin(self):
+        self.shown = set()
+
+    def show(self, kind, key, coords, **options):
+        """Place the item for key (kind "line", "oval", "text", ...)"""
+        item = self.items.get(key)
+        if item is None:
+            create = getattr(self.canvas, f"create_{kind}")
+            item = self.items[key] = create(*coords, tags=self.tag, **options)
+        else:
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, state=tk.NORMAL, **options)
+        self.shown.add(key)
+        return item
+
+    def end(self):
+        for key in self.visible - self.shown:
+            self.canvas.itemconfigure(self.items[key], state=tk.HIDDEN)
+        self.visible = self.shown
+        if self.visible:
+            self.canvas.tag_raise(self.tag)
+
+    def hide(self):
+        self.begin()
+        self.end()
+
+    def reset(self):
+        """Forget all items, e.g. after the canvas was wiped"""
+        self.canvas.delete(self.tag)
+        self.items.clear()
+        self.shown = set()
+        self.visible = set()
 
 class EnhancedClosestPairVisualizer:
     def __init__(self, root):
@@ -139,6 +188,7 @@ class EnhancedClosestPairVisualizer:
             "success_hover": "#219653",
             "info": "#9b59b6",
             "info_hover": "#8e44ad",
+            "group_b": "#16a085",
             "canvas_bg": "#ffffff",
             "grid": "#e8edf2",
             "panel_bg": "#ffffff",
@@ -147,17 +197,46 @@ class EnhancedClosestPairVisualizer:
         }
 
         # Points storage
-        self.points = []
+        self.points = PointStore()
         self.closest_pair = (None, None)
         self.min_distance = float('inf')
         self.point_counter = 0
         self.min_distance_between_points = 15  # Minimum distance between points
+        # Proximity index, one cell per minimum spacing; it also answers the
+        # mouse readout's nearest-point lookups, by store index
+        self.point_grid = SpatialGrid(self.min_distance_between_points)
+        # Closest pair kept current on every insertion, keyed by store index
+        self.live_pair = IncrementalClosestPair()
+        self.rng = random.Random()  # Single random points
+        # Solve results and step timelines of point sets seen before, keyed
+        # by a fingerprint kept current as points are added
+        self.fingerprint = PointSetFingerprint()
+        self.result_cache = ResultCache(max_entries=64)
+        # Timelines are bounded by estimated bytes: 64 MB is about 220k steps
+        self.timeline_cache = ResultCache(max_entries=8, max_size=64 << 20,
+                                          sizeof=StepTimeline.nbytes)
+        # Above this many points they are drawn as one density image
+        self.lod_threshold = 2000
+        self.raster_images = []  # Keeps the PhotoImages alive
+        # Point colour per group (set A, set B)
+        self.group_colors = (self.theme["accent"], self.theme["group_b"])
+
+        # Inputs above this size are solved in a background process
+        self.background_limit = 5000
+        self.solver = BackgroundSolver()
+        self.solve_job = None  # (algorithm, cache key) of the running solve
+        self.solve_notice = None  # (text, start time) of the running solve
+        self.tracer = BackgroundSolver()  # Records large trace files
+        self.trace_job = None  # Path of the trace being recorded
 
         # Visualization control
         self.visualization_speed = 200
         self.is_visualizing = False
         self.is_paused = False
-        self.visualization_steps = []
+        self.timeline = StepTimeline()  # Played steps, pulled lazily
+        self.timeline_key = None  # timeline_cache key of the playing timeline
+        self.trace = None  # TraceReader behind a replayed trace file
+        self.layer_counts = dict.fromkeys(LAYERS, 0)  # Timeline items on canvas
         self.current_step = 0
 
         # Animation states
@@ -336,6 +415,10 @@ class EnhancedClosestPairVisualizer:
                                highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
+        # Reused items for per-step highlights and the mouse readout
+        self.overlay = CanvasPool(self.canvas, "overlay")
+        self.hud = CanvasPool(self.canvas, "hud")
+
         # Draw initial grid
         self.draw_canvas_grid()
 
@@ -386,12 +469,47 @@ class EnhancedClosestPairVisualizer:
         ttk.Label(slider_frame, text="Points:",
                  foreground=self.theme["fg"]).pack(side=tk.LEFT)
         
+        # Logarithmic slider: 5 to 10,000 points
         self.point_count_var = tk.IntVar(value=15)
-        point_slider = ttk.Scale(slider_frame, from_=5, to=50,
+        ttk.Label(slider_frame, textvariable=self.point_count_var, width=6,
+                 foreground=self.theme["fg"]).pack(side=tk.RIGHT)
+        self.point_scale_var = tk.DoubleVar(value=math.log10(15))
+        point_slider = ttk.Scale(slider_frame, from_=math.log10(5), to=4,
                                 orient=tk.HORIZONTAL,
-                                variable=self.point_count_var)
+                                variable=self.point_scale_var,
+                                command=lambda value: self.point_count_var.set(
+                                    round(10 ** float(value))))
         point_slider.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(10, 0))
 
+        # Layout and seed for "Random Set"
+        layout_frame = ttk.Frame(frame)
+        layout_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(layout_frame, text="Layout:",
+                 foreground=self.theme["fg"]).pack(side=tk.LEFT)
+        self.layout_var = tk.StringVar(value="poisson")
+        ttk.Combobox(layout_frame, textvariable=self.layout_var,
+                     values=list(LAYOUTS), state="readonly",
+                     width=10).pack(side=tk.LEFT, padx=(10, 0))
+
+        self.seed_var = tk.IntVar(value=1)
+        ttk.Spinbox(layout_frame, from_=0, to=10**9, width=6,
+                    textvariable=self.seed_var).pack(side=tk.RIGHT)
+        ttk.Label(layout_frame, text="Seed:",
+                 foreground=self.theme["fg"]).pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Set new points are assigned to (for A/B closest pair)
+        group_frame = ttk.Frame(frame)
+        group_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(group_frame, text="Add to set:",
+                 foreground=self.theme["fg"]).pack(side=tk.LEFT)
+
+        self.group_var = tk.IntVar(value=GROUP_A)
+        for text, group in (("B", GROUP_B), ("A", GROUP_A)):
+            ttk.Radiobutton(group_frame, text=text, value=group,
+                            variable=self.group_var).pack(side=tk.RIGHT, padx=(10, 0))
+
         # Clear button
         self.clear_btn = RoundedButton(frame, text="Clear All",
                                       command=self.clear_points,
@@ -450,6 +568,21 @@ class EnhancedClosestPairVisualizer:
                                      hover_color=self.theme["accent_hover"])
         self.back_btn.grid(row=1, column=1, padx=2, pady=2, sticky=tk.EW)
         
+        # Recorded step traces
+        self.save_trace_btn = RoundedButton(control_grid, text="Save Trace",
+                                            command=self.save_trace,
+                                            width=75, height=35, radius=8,
+                                            bg_color=self.theme["info"],
+                                            hover_color=self.theme["info_hover"])
+        self.save_trace_btn.grid(row=2, column=0, padx=2, pady=2, sticky=tk.EW)
+
+        self.load_trace_btn = RoundedButton(control_grid, text="Load Trace",
+                                            command=self.load_trace,
+                                            width=75, height=35, radius=8,
+                                            bg_color=self.theme["info"],
+                                            hover_color=self.theme["info_hover"])
+        self.load_trace_btn.grid(row=2, column=1, padx=2, pady=2, sticky=tk.EW)
+
         control_grid.columnconfigure(0, weight=1)
         control_grid.columnconfigure(1, weight=1)
 
@@ -467,6 +600,43 @@ class EnhancedClosestPairVisualizer:
                                 command=self.update_speed)
         speed_slider.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(10, 0))
 
+        # Timeline scrubber over the steps generated so far
+        timeline_frame = ttk.Frame(frame)
+        timeline_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(timeline_frame, text="Timeline:",
+                 foreground=self.theme["fg"]).pack(side=tk.LEFT)
+
+        self.timeline_var = tk.IntVar(value=0)
+        self.timeline_slider = ttk.Scale(timeline_frame, from_=0, to=1,
+                                         orient=tk.HORIZONTAL,
+                                         variable=self.timeline_var,
+                                         command=self.scrub_timeline)
+        self.timeline_slider.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(10, 0))
+
+        # Solver used by "Solve Instantly"
+        algo_frame = ttk.Frame(frame)
+        algo_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(algo_frame, text="Algorithm:",
+                 foreground=self.theme["fg"]).pack(side=tk.LEFT)
+
+        self.algorithm_var = tk.StringVar(value="dc")
+        algo_box = ttk.Combobox(algo_frame, textvariable=self.algorithm_var,
+                                values=list(closest_pair.ALGORITHMS),
+                                state="readonly", width=10)
+        algo_box.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(10, 0))
+
+        # Closest pair between set A and set B instead of over all points
+        self.bichromatic_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Closest A-B pair",
+                        variable=self.bichromatic_var).pack(fill=tk.X, pady=(0, 5))
+
+        # Per-level solver metrics (divide & conquer only)
+        self.record_metrics_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Record solver metrics",
+                        variable=self.record_metrics_var).pack(fill=tk.X, pady=(0, 5))
+
         # Instant solve button
         self.solve_btn = RoundedButton(frame, text="Solve Instantly",
                                       command=self.find_closest_no_visual,
@@ -523,13 +693,26 @@ Complexity:
                                font=("Arial", 10))
         stats_label.pack(fill=tk.X)
 
+        # Solver metrics from the last instrumented solve
+        metrics_frame = ttk.LabelFrame(parent, text="Solver Metrics",
+                                      style="Panel.TLabelframe", padding="10")
+        metrics_frame.pack(fill=tk.X, pady=(0, 15))
+
+        self.metrics_text = tk.StringVar(value="Enable \"Record solver metrics\"")
+        metrics_label = ttk.Label(metrics_frame, textvariable=self.metrics_text,
+                                 justify=tk.LEFT,
+                                 foreground=self.theme["fg"],
+                                 font=("Arial", 10))
+        metrics_label.pack(fill=tk.X)
+
         # Legend
         legend_frame = ttk.LabelFrame(parent, text="Legend",
                                      style="Panel.TLabelframe", padding="10")
         legend_frame.pack(fill=tk.X)
         
         legend_items = [
-            ("●", "Regular Point", self.theme["accent"]),
+            ("●", "Regular Point (Set A)", self.theme["accent"]),
+            ("●", "Set B Point", self.theme["group_b"]),
             ("●", "Closest Pair", self.theme["danger"]),
             ("——", "Division Line", self.theme["success"]),
             ("▆", "Strip Area", self.theme["warning"]),
@@ -598,13 +781,34 @@ Complexity:
 
     def is_point_too_close(self, x, y):
         """Check if a new point is too close to existing points"""
-        for point in self.points:
-            distance = math.sqrt((point.x - x)**2 + (point.y - y)**2)
-            if distance < self.min_distance_between_points:
-                return True, point
+        index = self.point_grid.find_within(x, y, self.min_distance_between_points)
+        if index is not None:
+            return True, self.points[index]
         return False, None
 
-    def add_point(self, event):
+    def store_point(self, x, y, group=None, point_id=None):
+        """Append a point to the store and proximity grid; returns its index
+
+        The point joins the set picked in the controls unless a group is
+        given, and gets the next id unless point_id is given.
+        """
+        if group is None:
+            group = self.group_var.get()
+        if point_id is None:
+            self.point_counter += 1
+            point_id = self.point_counter
+        else:
+            self.point_counter = max(self.point_counter, point_id)
+        index = self.points.append(x, y, point_id, group)
+        self.fingerprint.add(point_id, x, y, group)
+        self.point_grid.insert(index, x, y)
+        if self.live_pair.insert(index, x, y):
+            i, j = self.live_pair.closest_pair
+            self.min_distance = self.live_pair.min_distance
+            self.closest_pair = (self.points[i], self.points[j])
+        return index
+
+    def add_point(self, event, animate=True):
         if self.is_visualizing and not self.is_paused:
             return
         
@@ -621,12 +825,14 @@ Complexity:
             self.status_var.set(f"Point too close to P{existing_point.id}!")
             return
         
-        self.point_counter += 1
-        point = EnhancedPoint(event.x, event.y, self.point_counter)
-        self.points.append(point)
+        index = self.store_point(event.x, event.y)
+        point = self.points[index]
         
-        # Draw point with animation
-        self.animate_point_creation(point)
+        # Draw point with animation (skipped while drag-painting)
+        if animate:
+            self.animate_point_creation(point)
+        else:
+            self.draw_point(point, self.group_colors[self.points.groups[index]], 6)
         self.update_stats()
         self.canvas_status.config(text=f"Point {self.point_counter} at ({event.x}, {event.y})")
         self.status_var.set(f"Added point P{self.point_counter}")
@@ -636,20 +842,20 @@ Complexity:
             return
         
         # Add point with spacing and duplicate prevention
-        if len(self.points) == 0 or (abs(event.x - self.points[-1].x) > 10 or abs(event.y - self.points[-1].y) > 10):
+        if len(self.points) == 0 or (abs(event.x - self.points.xs[-1]) > 10 or abs(event.y - self.points.ys[-1]) > 10):
             # Check if point is too close to existing points
             too_close, existing_point = self.is_point_too_close(event.x, event.y)
             if too_close:
                 return
-            self.add_point(event)
+            self.add_point(event, animate=False)
 
     def animate_point_creation(self, point):
         """Animate point appearance with subtle effect"""
-        color = self.theme["accent"]
+        color = self.group_colors[self.group_var.get()]
         sizes = [3, 6, 8, 6]  # Growing then settling
         
-        # Store the final drawing tag
-        final_tag = f"point_{point.id}"
+        # Final drawing tags: the shared "point" tag lets redraw_points replace it
+        final_tag = (f"point_{point.id}", "point")
         
         for size in sizes:
             # Clear any previous animation for this point
@@ -678,16 +884,15 @@ Complexity:
         
         # Try to find a valid position (max 100 attempts)
         for attempt in range(100):
-            x = 50 + (canvas_width - 100) * (0.1 + 0.8 * ((hash(str(time.time() + attempt)) % 1000) / 1000))
-            y = 50 + (canvas_height - 100) * (0.1 + 0.8 * ((hash(str(time.time() + attempt + 1000)) % 1000) / 1000))
+            x = self.rng.uniform(50, canvas_width - 50)
+            y = self.rng.uniform(50, canvas_height - 50)
             
             # Check if point is too close to existing points
             too_close, _ = self.is_point_too_close(x, y)
             if not too_close:
-                self.point_counter += 1
-                point = EnhancedPoint(x, y, self.point_counter)
-                self.points.append(point)
-                self.draw_point(point, self.theme["accent"], 6)
+                index = self.store_point(x, y)
+                self.draw_point_at(x, y, self.point_counter,
+                                   self.group_colors[self.points.groups[index]], 6)
                 self.update_stats()
                 self.canvas_status.config(text=f"Random point {self.point_counter} added")
                 self.status_var.set(f"Added random point P{self.point_counter}")
@@ -707,38 +912,35 @@ Complexity:
         canvas_width = self.canvas.winfo_width() or 700
         canvas_height = self.canvas.winfo_height() or 500
         
-        points_added = 0
-        max_attempts = count * 10  # Maximum attempts to place points
-        
-        for attempt in range(max_attempts):
-            if points_added >= count:
-                break
-                
-            # Generate point with some randomness
-            spacing_factor = points_added / max(count, 1)
-            x = 50 + (canvas_width - 100) * (0.1 + 0.8 * (spacing_factor + 0.2 * ((hash(str(attempt)) % 1000) / 1000)))
-            y = 50 + (canvas_height - 100) * (0.1 + 0.8 * ((hash(str(attempt + 1000)) % 1000) / 1000))
-            
-            # Check if point is too close to existing points
-            too_close, _ = self.is_point_too_close(x, y)
-            if not too_close:
-                self.point_counter += 1
-                point = EnhancedPoint(x, y, self.point_counter)
-                self.points.append(point)
-                self.draw_point(point, self.theme["accent"])
-                points_added += 1
-        
+        # Generated sets skip the click spacing rule; "poisson" spaces its
+        # points as widely as the count allows
+        layout = self.layout_var.get()
+        seed = self.seed_var.get()
+        xs, ys = generate(layout, count, canvas_width - 100, canvas_height - 100, seed)
+        bichromatic = self.bichromatic_var.get()
+        for k in range(len(xs)):
+            # Alternate sets so there is something to compare in A/B mode
+            group = k % 2 if bichromatic else None
+            self.store_point(xs[k] + 50, ys[k] + 50, group)
+        # Next press gives a new set; entering the seed again reproduces this one
+        self.seed_var.set(seed + 1)
+        
+        self.redraw_points()
         self.update_stats()
-        if points_added < count:
-            self.status_var.set(f"Added {points_added} points (some positions unavailable)")
+        if len(xs) < count:
+            self.status_var.set(f"Added {len(xs)} of {count} {layout} points, seed {seed} "
+                                f"(canvas full, {count - len(xs)} did not fit)")
         else:
-            self.status_var.set(f"Added {count} random points")
+            self.status_var.set(f"Added {count} {layout} points, seed {seed}")
 
     def draw_point(self, point, color, size=6, tag=None):
         """Draw a point on the canvas"""
+        self.draw_point_at(point.x, point.y, point.id, color, size, tag)
+
+    def draw_point_at(self, x, y, point_id, color, size=6, tag=None):
+        """Draw a point from raw coordinates, without a point object"""
         if tag is None:
-            tag = f"point_{point.id}"
-        x, y = point.x, point.y
+            tag = (f"point_{point_id}", "point")
         
         # Draw point with shadow effect
         self.canvas.create_oval(x - size - 1, y - size - 1,
@@ -751,18 +953,62 @@ Complexity:
                                width=1, tags=tag)
         
         # Draw point ID if not too many points
-        if point.id and len(self.points) <= 30:
+        if point_id and len(self.points) <= 30:
             self.canvas.create_text(x, y - size - 8,
-                                   text=f"P{point.id}",
+                                   text=f"P{point_id}",
                                    fill=color,
                                    font=("Arial", 8, "bold"),
                                    tags=tag)
 
+    def draw_all_points(self, size=6, skip_ids=()):
+        """Draw every stored point straight from the coordinate columns"""
+        xs, ys, ids, groups = self.points.xs, self.points.ys, self.points.ids, self.points.groups
+        for i in range(len(xs)):
+            if ids[i] not in skip_ids:
+                self.draw_point_at(xs[i], ys[i], ids[i], self.group_colors[groups[i]], size)
+
+    def redraw_points(self, skip_ids=()):
+        """Replace every drawn point, rasterizing when there are too many
+
+        Below lod_threshold each point gets its own ovals; above it the set
+        becomes a single density image, and only highlighted points (drawn
+        separately with their own tags) stay individual canvas items.
+        """
+        self.canvas.delete("point")
+        self.canvas.delete("raster")
+        self.raster_images = []
+        if len(self.points) <= self.lod_threshold:
+            self.draw_all_points(6, skip_ids)
+            return
+
+        width = self.canvas.winfo_width() or 700
+        height = self.canvas.winfo_height() or 500
+        xs, ys, groups = self.points.xs, self.points.ys, self.points.groups
+        # One image per set so each keeps its colour
+        for group in (GROUP_A, GROUP_B):
+            members = [i for i in range(len(xs)) if groups[i] == group]
+            if not members:
+                continue
+            png = render_density_png([xs[i] for i in members], [ys[i] for i in members],
+                                     width, height, self.group_colors[group])
+            image = tk.PhotoImage(data=png, format="png")
+            self.raster_images.append(image)
+            self.canvas.create_image(0, 0, image=image, anchor=tk.NW, tags="raster")
+        self.canvas.tag_raise("raster", "grid")
+
     def clear_points(self):
+        self.cancel_solve()
+        self.cancel_trace()
         self.is_visualizing = False
         self.is_paused = False
         self.current_step = 0
-        self.visualization_steps = []
+        self.timeline = StepTimeline()
+        self.timeline_key = None
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+        self.layer_counts = dict.fromkeys(LAYERS, 0)
+        self.timeline_var.set(0)
         
         # Reset button states
         self.start_btn.is_hovered = False
@@ -771,12 +1017,17 @@ Complexity:
         
         self.pause_btn.is_hovered = False
         self.pause_btn.is_pressed = False
+        self.pause_btn.set_text("Pause")
         self.pause_btn.draw_button()
         
         self.progress_var.set(0)
         self.step_info.set("Ready")
         
-        self.points = []
+        self.points.clear()
+        self.fingerprint.clear()
+        self.raster_images = []
+        self.point_grid.clear()
+        self.live_pair.clear()
         self.closest_pair = (None, None)
         self.min_distance = float('inf')
         self.point_counter = 0
@@ -785,6 +1036,8 @@ Complexity:
         for item in self.canvas.find_all():
             if "grid" not in self.canvas.gettags(item):
                 self.canvas.delete(item)
+        self.overlay.reset()
+        self.hud.reset()
         self.draw_canvas_grid()
         self.update_stats()
         self.status_var.set("Ready")
@@ -801,13 +1054,15 @@ Complexity:
             self.stats_text.set("Points: 0\nClosest Distance: N/A")
 
     def show_mouse_position(self, event):
-        self.canvas.delete("mouse_pos")
-        self.canvas.create_text(10, 10,
-                               text=f"({event.x}, {event.y})",
-                               anchor=tk.NW,
-                               fill="#666666",
-                               font=("Arial", 9),
-                               tags="mouse_pos")
+        text = f"({event.x}, {event.y})"
+        if len(self.points) > 0:
+            dist, index = self.point_grid.nearest(event.x, event.y)
+            text += f"  nearest P{self.points.ids[index]} ({dist:.1f})"
+        self.hud.show("text", "mouse_pos", (10, 10),
+                      text=text,
+                      anchor=tk.NW,
+                      fill="#666666",
+                      font=("Arial", 9))
 
     def start_visualization(self):
         if len(self.points) < 2:
@@ -816,10 +1071,23 @@ Complexity:
             
         if self.is_visualizing:
             return
-            
+
+        # A point set played before replays its timeline without re-solving;
+        # otherwise sort points and generate steps lazily while playing
+        key = self.fingerprint.key
+        timeline = self.timeline_cache.get(key)
+        if timeline is None:
+            points_sorted = sorted(self.points, key=lambda p: p.x)
+            timeline = StepTimeline(closest_pair.iter_visualization_steps(points_sorted))
+            self.timeline_cache.put(key, timeline)
+            self.play_timeline(timeline, "Visualization started", key)
+        else:
+            self.play_timeline(timeline, "Visualization started (cached steps)", key)
+
+    def play_timeline(self, timeline, message, key=None):
+        """Play a timeline from its first step; key is its timeline_cache key, if cached"""
         self.is_visualizing = True
         self.is_paused = False
-        self.visualization_steps = []
         self.current_step = 0
         
         # Update button states
@@ -829,6 +1097,7 @@ Complexity:
         
         self.pause_btn.is_hovered = False
         self.pause_btn.is_pressed = False
+        self.pause_btn.set_text("Pause")
         self.pause_btn.draw_button()
         
         # Clear previous visualization
@@ -836,186 +1105,100 @@ Complexity:
         self.canvas.delete("closest")
         self.canvas.delete("strip")
         self.canvas.delete("divider")
-        self.canvas.delete("temp")
+        self.overlay.hide()
+        self.layer_counts = dict.fromkeys(LAYERS, 0)
         
-        # Sort points
-        points_sorted = sorted(self.points, key=lambda p: p.x)
+        self.timeline = timeline
+        self.timeline_key = key
+        self.timeline_var.set(0)
         
-        self.status_var.set("Generating steps...")
-        self.root.update()
-        self.generate_visualization_steps(points_sorted)
-        
-        self.status_var.set("Visualization started")
+        self.status_var.set(message)
         self.progress_var.set(0)
         self.root.after(100, self.run_visualization)
 
-    def generate_visualization_steps(self, points):
-        """Generate visualization steps - O(n log n)"""
-        def dc_with_steps(points_x, points_y, depth=0, side=""):
-            if len(points_x) <= 3:
-                step = {
-                    "type": "base_case",
-                    "points": points_x[:],
-                    "depth": depth,
-                    "side": side,
-                    "message": f"Base case ({side}) - {len(points_x)} points\nUsing brute force"
-                }
-                self.visualization_steps.append(step)
-                
-                min_dist = float('inf')
-                closest = (None, None)
-                
-                for i in range(len(points_x)):
-                    for j in range(i+1, len(points_x)):
-                        dist = points_x[i].distance_to(points_x[j])
-                        step_compare = {
-                            "type": "compare",
-                            "points": [points_x[i], points_x[j]],
-                            "distance": dist,
-                            "depth": depth,
-                            "side": side,
-                            "message": f"Comparing {points_x[i]} ↔ {points_x[j]}\nDistance = {dist:.2f}"
-                        }
-                        self.visualization_steps.append(step_compare)
-                        
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest = (points_x[i], points_x[j])
-                
-                step_result = {
-                    "type": "result",
-                    "min_distance": min_dist,
-                    "closest_pair": closest,
-                    "depth": depth,
-                    "side": side,
-                    "message": f"Result ({side})\nDistance = {min_dist:.2f}"
-                }
-                self.visualization_steps.append(step_result)
-                return min_dist, closest
-
-            # Divide step
-            mid = len(points_x) // 2
-            mid_point = points_x[mid]
-            mid_x = mid_point.x
-            
-            step_divide = {
-                "type": "divide",
-                "mid_x": mid_x,
-                "left_points": points_x[:mid],
-                "right_points": points_x[mid:],
-                "depth": depth,
-                "side": side,
-                "message": f"Divide (Depth {depth})\nAt x = {mid_x:.1f}\nLeft: {len(points_x[:mid])}, Right: {len(points_x[mid:])}"
-            }
-            self.visualization_steps.append(step_divide)
-
-            # Split points_y into left and right based on x-coordinate - O(n)
-            # Use set for O(1) lookup of left points
-            left_set = set(points_x[:mid])
-            left_y = [p for p in points_y if p in left_set]
-            right_y = [p for p in points_y if p not in left_set]
-
-            # Recursive calls
-            left_min, left_closest = dc_with_steps(points_x[:mid], left_y, depth + 1, "L")
-            right_min, right_closest = dc_with_steps(points_x[mid:], right_y, depth + 1, "R")
-
-            # Combine results
-            min_dist = min(left_min, right_min)
-            closest = left_closest if left_min < right_min else right_closest
-            
-            step_combine = {
-                "type": "combine",
-                "min_dist": min_dist,
-                "closest": closest,
-                "depth": depth,
-                "side": side,
-                "message": f"Combine (Depth {depth})\nCurrent min: {min_dist:.2f}"
-            }
-            self.visualization_steps.append(step_combine)
-
-            # Check strip - use y-sorted array, no sorting needed - O(n)
-            strip_points = [p for p in points_y if abs(p.x - mid_x) < min_dist]
-            
-            step_strip = {
-                "type": "strip",
-                "mid_x": mid_x,
-                "strip_width": 2 * min_dist,
-                "strip_points": strip_points,
-                "depth": depth,
-                "side": side,
-                "message": f"Checking strip\nPoints in strip: {len(strip_points)}"
-            }
-            self.visualization_steps.append(step_strip)
-
-            # Check points in strip - O(n) since we only check up to 7 neighbors per point
-            for i in range(len(strip_points)):
-                for j in range(i+1, min(i+8, len(strip_points))):
-                    if strip_points[j].y - strip_points[i].y >= min_dist:
-                        break
-                        
-                    dist = strip_points[i].distance_to(strip_points[j])
-                    step_compare_strip = {
-                        "type": "compare_strip",
-                        "points": [strip_points[i], strip_points[j]],
-                        "distance": dist,
-                        "depth": depth,
-                        "side": side,
-                        "message": f"Strip comparison\nDistance = {dist:.2f}"
-                    }
-                    self.visualization_steps.append(step_compare_strip)
-                    
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest = (strip_points[i], strip_points[j])
-
-            step_final = {
-                "type": "final",
-                "min_distance": min_dist,
-                "closest_pair": closest,
-                "depth": depth,
-                "side": side,
-                "message": f"Depth {depth} result\nDistance = {min_dist:.2f}"
-            }
-            self.visualization_steps.append(step_final)
-
-            return min_dist, closest
-
-        # Add initial step
-        initial_step = {
-            "type": "start",
-            "points": points[:],
-            "message": f"Starting algorithm\n{len(points)} points"
-        }
-        self.visualization_steps.append(initial_step)
+    def save_trace(self):
+        """Record the steps for the current points to a trace file"""
+        if len(self.points) < 2:
+            messagebox.showinfo("Not Enough Points", "Please add at least 2 points!")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".cpt",
+                                            filetypes=[("Step traces", "*.cpt")])
+        if not path:
+            return
+        if len(self.points) > self.background_limit:
+            # Recording takes seconds at this size: write it from a child process
+            polling = self.trace_job is not None
+            self.tracer.submit_trace(path, self.points.xs, self.points.ys, self.points.ids)
+            self.trace_job = path
+            if not polling:
+                self.root.after(50, self.poll_tracer)
+            return
+        points_sorted = sorted(self.points, key=lambda p: p.x)
+        count = record_trace(path, points_sorted)
+        self.status_var.set(f"Saved {count} steps to {os.path.basename(path)}")
 
-        # Pre-sort by y-coordinate once - O(n log n)
-        points_y = sorted(points, key=lambda p: p.y)
-        
-        # Run the algorithm
-        start_time = time.time()
-        self.min_distance, self.closest_pair = dc_with_steps(points, points_y)
-        elapsed_time = (time.time() - start_time) * 1000
+    def poll_tracer(self):
+        """Drain messages from the background trace recording until it is done"""
+        if self.trace_job is None:
+            return
+        for kind, payload in self.tracer.poll():
+            if kind in ("started", "progress"):
+                self.status_var.set(payload)
+            elif kind == "error":
+                self.trace_job = None
+                self.status_var.set(f"Saving trace failed: {payload}")
+            else:
+                self.trace_job = None
+                self.status_var.set(f"Saved {payload['steps']} steps to "
+                                    f"{os.path.basename(payload['path'])}")
+        if self.trace_job is not None:
+            self.root.after(50, self.poll_tracer)
+
+    def load_trace(self):
+        """Replace the points with those of a trace file and replay its steps
+
+        Steps are read from the file as they are played, not re-solved.
+        """
+        if self.is_visualizing and not self.is_paused:
+            return
+        path = filedialog.askopenfilename(filetypes=[("Step traces", "*.cpt"),
+                                                     ("All files", "*")])
+        if not path:
+            return
+        try:
+            trace = TraceReader(path)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Load Trace", str(exc))
+            return
 
-        # Add final summary
-        summary_step = {
-            "type": "summary",
-            "min_distance": self.min_distance,
-            "closest_pair": self.closest_pair,
-            "time_ms": elapsed_time,
-            "total_steps": len(self.visualization_steps),
-            "message": f"Algorithm complete\nDistance: {self.min_distance:.2f}\nTime: {elapsed_time:.1f}ms"
-        }
-        self.visualization_steps.append(summary_step)
+        self.clear_points()
+        # Keep the recorded ids so labels and highlights match the steps
+        for k in sorted(range(trace.n), key=trace.ids.__getitem__):
+            self.store_point(trace.xs[k], trace.ys[k], GROUP_A, trace.ids[k])
+        self.trace = trace
+        self.redraw_points()
+        self.update_stats()
+        self.play_timeline(StepTimeline(steps=trace),
+                           f"Replaying {os.path.basename(path)} ({len(trace)} steps)")
+
+    def next_step(self):
+        """Return the step at current_step, pulling it from the generator if needed"""
+        pulled = len(self.timeline)
+        step = self.timeline.fetch(self.current_step)
+        if len(self.timeline) > pulled and self.timeline_key is not None:
+            # The cached timeline grew: re-account it against the size bound
+            self.timeline_cache.resized(self.timeline_key)
+        self.timeline_slider.configure(to=max(len(self.timeline), 1))
+        return step
 
     def run_visualization(self):
         if not self.is_visualizing or self.is_paused:
             return
             
-        if self.current_step < len(self.visualization_steps):
-            progress = (self.current_step / len(self.visualization_steps)) * 100
-            self.progress_var.set(progress)
+        if self.next_step() is not None:
             self.visualize_step(self.current_step)
             self.current_step += 1
+            self.timeline_var.set(self.current_step)
             self.root.after(self.visualization_speed, self.run_visualization)
         else:
             self.is_visualizing = False
@@ -1029,10 +1212,10 @@ Complexity:
     def toggle_pause(self):
         self.is_paused = not self.is_paused
         if self.is_paused:
-            self.pause_btn.config(text="Resume")
+            self.pause_btn.set_text("Resume")
             self.status_var.set("Paused")
         else:
-            self.pause_btn.config(text="Pause")
+            self.pause_btn.set_text("Pause")
             self.status_var.set("Resumed")
             self.run_visualization()
 
@@ -1041,141 +1224,138 @@ Complexity:
             self.start_visualization()
             return
             
-        if self.is_paused and self.current_step < len(self.visualization_steps):
+        if self.is_paused and self.next_step() is not None:
             self.visualize_step(self.current_step)
             self.current_step += 1
-            self.progress_var.set((self.current_step / len(self.visualization_steps)) * 100)
+            self.timeline_var.set(self.current_step)
 
     def step_backward(self):
         if self.is_visualizing and self.current_step > 0 and self.is_paused:
             self.current_step -= 1
             self.redraw_to_step(self.current_step)
+            self.timeline_var.set(self.current_step)
+
+    def scrub_timeline(self, value):
+        """Seek to the step picked on the timeline slider"""
+        if len(self.timeline) == 0 or (self.is_visualizing and not self.is_paused):
+            return
+        step_idx = min(int(float(value)), len(self.timeline))
+        if step_idx != self.current_step:
+            self.current_step = step_idx
+            self.redraw_to_step(step_idx)
 
     def redraw_to_step(self, step_idx):
-        # Clear and redraw up to step_idx
-        self.canvas.delete("all")
-        self.draw_canvas_grid()
-        
-        # Draw all points
-        for point in self.points:
-            self.draw_point(point, self.theme["accent"], 6)
-        
-        # Replay steps up to step_idx
-        for i in range(step_idx):
-            step = self.visualization_steps[i]
-            
-            if step["type"] == "divide":
-                mid_x = step["mid_x"]
-                canvas_height = self.canvas.winfo_height() or 500
-                self.canvas.create_line(mid_x, 0, mid_x, canvas_height,
-                                       fill=self.theme["success"], width=2, tags="divider", dash=(5, 2))
-            elif step["type"] == "strip":
-                mid_x = step["mid_x"]
-                strip_width = step["strip_width"]
-                canvas_height = self.canvas.winfo_height() or 500
-                self.canvas.create_rectangle(
-                    mid_x - strip_width/2, 0,
-                    mid_x + strip_width/2, canvas_height,
-                    fill=self.theme["warning"], stipple="gray50",
-                    outline="", tags="strip"
-                )
-            elif step["type"] in ["compare", "compare_strip"]:
-                p1, p2 = step["points"]
-                self.canvas.create_line(p1.x, p1.y, p2.x, p2.y,
-                                       fill="#666666", width=1,
-                                       dash=(2, 2), tags="temp")
-            elif step["type"] in ["result", "final", "summary"]:
-                if step["closest_pair"][0] and step["closest_pair"][1]:
-                    p1, p2 = step["closest_pair"]
-                    self.canvas.create_line(p1.x, p1.y, p2.x, p2.y,
-                                           fill=self.theme["danger"], width=2,
-                                           tags="line")
-                    self.draw_point(p1, self.theme["danger"], 8)
-                    self.draw_point(p2, self.theme["danger"], 8)
-        
-        # Update step info
+        """Show the canvas as it was after the first step_idx steps"""
         if step_idx > 0:
-            self.step_info.set(self.visualization_steps[step_idx - 1]["message"])
+            # Re-showing the previous step restores its highlights and text
+            self.visualize_step(step_idx - 1)
         else:
+            self.overlay.hide()
+            self.sync_layers(0)
             self.step_info.set("Ready")
 
-    def visualize_step(self, step_idx):
-        step = self.visualization_steps[step_idx]
-        
-        # Clear temporary drawings
-        self.canvas.delete("temp")
-        self.canvas.delete("highlight")
-        
-        # Update step info
-        self.step_info.set(step["message"])
-        
-        # Draw based on step type
-        if step["type"] == "divide":
+    def sync_layers(self, step_idx):
+        """Add or remove persistent canvas items to match the timeline state
+
+        Only the difference to what is already drawn is touched, and the
+        timeline replays at most one checkpoint interval to find the state.
+        """
+        counts = dict(zip(LAYERS, self.timeline.state_at(step_idx)))
+        finished = step_idx > 0 and self.timeline[step_idx - 1]["type"] == "summary"
+        if finished:
+            counts["pairs"] = 0
+        else:
+            self.canvas.delete("closest")
+
+        for layer in LAYERS:
+            drawn = self.layer_counts[layer]
+            while drawn > counts[layer]:
+                drawn -= 1
+                self.canvas.delete(f"{layer}_{drawn}")
+            while drawn < counts[layer]:
+                self.draw_layer_item(layer, drawn)
+                drawn += 1
+            self.layer_counts[layer] = drawn
+
+    def draw_layer_item(self, layer, k):
+        """Draw the k-th divider, strip or best-pair line of the run"""
+        step = self.timeline.entry(layer, k)
+        tag = f"{layer}_{k}"
+        canvas_height = self.canvas.winfo_height() or 500
+        if layer == "dividers":
             mid_x = step["mid_x"]
-            canvas_height = self.canvas.winfo_height() or 500
             self.canvas.create_line(mid_x, 0, mid_x, canvas_height,
-                                   fill=self.theme["success"], width=2, tags="divider", dash=(5, 2))
-            self.status_var.set(f"Dividing at x = {mid_x:.1f}")
-            
-        elif step["type"] == "strip":
+                                   fill=self.theme["success"], width=2,
+                                   tags=("divider", tag), dash=(5, 2))
+        elif layer == "strips":
             mid_x = step["mid_x"]
             strip_width = step["strip_width"]
-            canvas_height = self.canvas.winfo_height() or 500
             self.canvas.create_rectangle(
                 mid_x - strip_width/2, 0,
                 mid_x + strip_width/2, canvas_height,
                 fill=self.theme["warning"], stipple="gray50",
-                outline="", tags="strip"
+                outline="", tags=("strip", tag)
             )
-            self.status_var.set(f"Strip with {len(step['strip_points'])} points")
+        else:
+            p1, p2 = step["closest_pair"]
+            self.canvas.create_line(p1.x, p1.y, p2.x, p2.y,
+                                   fill=self.theme["danger"], width=2,
+                                   tags=("line", tag))
+
+    def visualize_step(self, step_idx):
+        step = self.timeline[step_idx]
+        
+        # Highlights reuse the overlay items; unused ones are hidden at the end
+        self.overlay.begin()
+        
+        # Update step info
+        self.step_info.set(closest_pair.step_message(step))
+        
+        # Dividers, strips and pair lines come from the timeline
+        self.sync_layers(step_idx + 1)
+        
+        # Draw based on step type
+        if step["type"] == "divide":
+            self.status_var.set(f"Dividing at x = {step['mid_x']:.1f}")
+            
+        elif step["type"] == "strip":
+            self.status_var.set(f"Strip with {step['strip_count']} points")
             
         elif step["type"] in ["compare", "compare_strip"]:
             p1, p2 = step["points"]
             # Draw comparison line
-            self.canvas.create_line(p1.x, p1.y, p2.x, p2.y,
-                                   fill="#666666", width=1,
-                                   dash=(2, 2), tags="temp")
+            self.overlay.show("line", "compare_line", (p1.x, p1.y, p2.x, p2.y),
+                              fill="#666666", width=1, dash=(2, 2))
             # Highlight points
-            self.draw_point(p1, "#666666", 8, "highlight")
-            self.draw_point(p2, "#666666", 8, "highlight")
+            self.show_highlight(0, p1, "#666666", 8)
+            self.show_highlight(1, p2, "#666666", 8)
             # Show distance
             mid_x = (p1.x + p2.x) / 2
             mid_y = (p1.y + p2.y) / 2
-            self.canvas.create_text(mid_x, mid_y,
-                                   text=f"{step['distance']:.2f}",
-                                   fill="#666666", font=("Arial", 9),
-                                   tags="temp")
+            self.overlay.show("text", "compare_text", (mid_x, mid_y),
+                              text=f"{step['distance']:.2f}",
+                              fill="#666666", font=("Arial", 9))
             self.status_var.set(f"Distance = {step['distance']:.2f}")
             
         elif step["type"] in ["result", "final"]:
             if step["closest_pair"][0]:
                 p1, p2 = step["closest_pair"]
-                # Draw connection
-                self.canvas.create_line(p1.x, p1.y, p2.x, p2.y,
-                                       fill=self.theme["danger"], width=2,
-                                       tags="line")
                 # Highlight points
-                self.draw_point(p1, self.theme["danger"], 8, "highlight")
-                self.draw_point(p2, self.theme["danger"], 8, "highlight")
+                self.show_highlight(0, p1, self.theme["danger"], 8)
+                self.show_highlight(1, p2, self.theme["danger"], 8)
                 # Show distance
-                self.canvas.create_text((p1.x + p2.x)/2, (p1.y + p2.y)/2 - 15,
-                                       text=f"{step['min_distance']:.2f}",
-                                       fill=self.theme["danger"], font=("Arial", 10),
-                                       tags="highlight")
+                self.overlay.show("text", "result_text",
+                                  ((p1.x + p2.x)/2, (p1.y + p2.y)/2 - 15),
+                                  text=f"{step['min_distance']:.2f}",
+                                  fill=self.theme["danger"], font=("Arial", 10))
             self.status_var.set(f"Found: {step['min_distance']:.2f}")
+            if "settled" in step:
+                self.progress_var.set(step["settled"] / len(self.points) * 100)
             
         elif step["type"] == "summary":
+            self.canvas.delete("closest")
             if step["closest_pair"][0]:
                 p1, p2 = step["closest_pair"]
-                # Clear previous
-                self.canvas.delete("line")
-                self.canvas.delete("closest")
-                
-                # Draw all points normally
-                for point in self.points:
-                    if point != p1 and point != p2:
-                        self.draw_point(point, self.theme["accent"], 6)
-                
                 # Draw final pair
                 self.draw_point(p1, self.theme["danger"], 10, "closest")
                 self.draw_point(p2, self.theme["danger"], 10, "closest")
@@ -1192,7 +1372,23 @@ Complexity:
                 self.min_distance = step['min_distance']
                 self.closest_pair = step['closest_pair']
                 self.update_stats()
-                self.perf_text.set(f"Steps: {len(self.visualization_steps)} | Time: {step['time_ms']:.1f}ms")
+                self.perf_text.set(f"Steps: {step['total_steps']} | Time: {step['time_ms']:.1f}ms")
+            self.progress_var.set(100)
+
+        self.overlay.end()
+
+    def show_highlight(self, slot, point, color, size):
+        """draw_point for the pooled highlight markers (slot 0 or 1)"""
+        x, y = point.x, point.y
+        self.overlay.show("oval", f"shadow_{slot}",
+                          (x - size - 1, y - size - 1, x + size + 1, y + size + 1),
+                          fill="#e0e0e0", outline="")
+        self.overlay.show("oval", f"dot_{slot}", (x - size, y - size, x + size, y + size),
+                          fill=color, outline=color, width=1)
+        if point.id and len(self.points) <= 30:
+            self.overlay.show("text", f"label_{slot}", (x, y - size - 8),
+                              text=f"P{point.id}", fill=color,
+                              font=("Arial", 8, "bold"))
 
     def find_closest_no_visual(self):
         if len(self.points) < 2:
@@ -1203,18 +1399,97 @@ Complexity:
         self.canvas.delete("line")
         self.canvas.delete("closest")
         
-        # Sort and run
-        points_sorted = sorted(self.points, key=lambda p: p.x)
+        # Solve on the stored coordinate columns
+        algorithm = self.algorithm_var.get()
+        bichromatic = self.bichromatic_var.get()
+        if bichromatic:
+            algorithm = "A-B"
+        record = (not bichromatic and self.record_metrics_var.get()
+                  and algorithm in closest_pair.INSTRUMENTED)
+
+        key = (self.fingerprint.key, algorithm, record)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            min_distance, ids, elapsed_time, stats = cached
+            pair = tuple(None if id is None else self.points.index_of(id) for id in ids)
+            self.show_solution(algorithm, min_distance, pair, elapsed_time, stats)
+            self.status_var.set(f"Solved: {min_distance:.2f} (cached)")
+            return
+
+        if len(self.points) > self.background_limit:
+            # Large inputs: keep the window responsive and poll for the result.
+            # A new solve replaces a running one, whose poll loop carries on
+            polling = self.solve_job is not None
+            self.solver.submit(self.points.xs, self.points.ys, algorithm,
+                               self.points.groups if bichromatic else None, record)
+            self.solve_job = (algorithm, key)
+            self.solve_notice = ("Solving in background", time.time())
+            self.status_var.set("Solving in background...")
+            if not polling:
+                self.root.after(50, self.poll_solver)
+            return
+
+        stats = closest_pair.SolverStats() if record else None
         start_time = time.time()
-        self.min_distance, self.closest_pair = self.closest_pair_dc(points_sorted)
+        if bichromatic:
+            min_distance, pair = self.points.bichromatic_closest_pair()
+        else:
+            min_distance, pair = self.points.closest_pair(algorithm, stats)
         elapsed_time = (time.time() - start_time) * 1000
+        self.cache_solution(key, min_distance, pair, elapsed_time, stats)
+        self.show_solution(algorithm, min_distance, pair, elapsed_time, stats)
+
+    def poll_solver(self):
+        """Drain messages from the background solve; reschedules itself until done"""
+        if self.solve_job is None:
+            return
+        algorithm, key = self.solve_job
+        for kind, payload in self.solver.poll():
+            if kind == "started":
+                self.solve_notice = (payload, self.solve_notice[1])
+            elif kind == "error":
+                self.solve_job = None
+                self.status_var.set(f"Solve failed: {payload}")
+            elif key[0] != self.fingerprint.key:
+                # Points were added while solving; the answer is stale
+                self.solve_job = None
+                self.status_var.set("Points changed while solving - solve again")
+            else:
+                self.solve_job = None
+                self.cache_solution(key, payload["min_dist"], payload["pair"],
+                                    payload["time_ms"], payload["stats"])
+                self.show_solution(algorithm, payload["min_dist"], payload["pair"],
+                                   payload["time_ms"], payload["stats"])
+        if self.solve_job is not None:
+            # Solvers report no progress: show how long this one has run
+            text, started = self.solve_notice
+            self.status_var.set(f"{text}... {time.time() - started:.1f}s")
+            self.root.after(50, self.poll_solver)
+
+    def cancel_solve(self):
+        self.solver.cancel()
+        self.solve_job = None
+
+    def cancel_trace(self):
+        """Stop a background trace recording; its partial file is removed"""
+        self.tracer.cancel()
+        self.trace_job = None
+
+    def cache_solution(self, key, min_distance, pair, elapsed_time, stats=None):
+        """Remember a solve result; the pair is kept as point ids, not indices"""
+        ids = tuple(None if i is None else self.points.ids[i] for i in pair)
+        self.result_cache.put(key, (min_distance, ids, elapsed_time, stats))
+
+    def show_solution(self, algorithm, min_distance, pair, elapsed_time, stats=None):
+        """Draw a solve result given as store indices"""
+        i, j = pair
+        self.min_distance = min_distance
+        self.closest_pair = (self.points[i], self.points[j]) if i is not None else (None, None)
         
         # Draw result
         if self.closest_pair[0] and self.closest_pair[1]:
             # Draw all points normally
-            for point in self.points:
-                if point != self.closest_pair[0] and point != self.closest_pair[1]:
-                    self.draw_point(point, self.theme["accent"], 6)
+            self.redraw_points((self.closest_pair[0].id, self.closest_pair[1].id))
             # Highlight closest pair
             self.draw_point(self.closest_pair[0], self.theme["danger"], 10, "closest")
             self.draw_point(self.closest_pair[1], self.theme["danger"], 10, "closest")
@@ -1231,102 +1506,26 @@ Complexity:
         
         self.update_stats()
         self.status_var.set(f"Solved: {self.min_distance:.2f}")
-        self.perf_text.set(f"Time: {elapsed_time:.1f}ms")
+        if stats is not None:
+            self.metrics_text.set(stats.summary())
+            self.perf_text.set(f"Comparisons: {stats.distance_evals} | "
+                               f"Time: {elapsed_time:.1f}ms")
+        else:
+            self.perf_text.set(f"Algorithm: {algorithm} | Time: {elapsed_time:.1f}ms")
 
-    def closest_pair_dc(self, points_x):
-    
+    def on_close(self):
+        self.cancel_solve()
+        self.cancel_trace()
+        self.root.destroy()
 
-            def brute_force(points):
-                min_dist = float('inf')
-                closest = (None, None)
-
-                i = 0
-                while i < len(points):
-                    j = i + 1
-                    while j < len(points):
-                        dist = points[i].distance_to(points[j])
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest = (points[i], points[j])
-                        j += 1
-                    i += 1
-
-                return min_dist, closest
-
-            def dc_recursive(points_x, points_y):
-                n = len(points_x)
-
-                if n <= 3:
-                    return brute_force(points_x)
-
-                mid = n // 2
-                mid_point = points_x[mid]
-
-                # build set of left-half points
-                left_set = set()
-                i = 0
-                while i < mid:
-                    left_set.add(points_x[i])
-                    i += 1
-
-                # split points_y manually
-                left_y = []
-                right_y = []
-
-                i = 0
-                while i < len(points_y):
-                    p = points_y[i]
-                    if p in left_set:
-                        left_y.append(p)
-                    else:
-                        right_y.append(p)
-                    i += 1
-
-                left_min, left_closest = dc_recursive(points_x[:mid], left_y)
-                right_min, right_closest = dc_recursive(points_x[mid:], right_y)
-
-                if left_min < right_min:
-                    min_dist = left_min
-                    closest = left_closest
-                else:
-                    min_dist = right_min
-                    closest = right_closest
-
-                # build strip explicitly
-                strip = []
-                i = 0
-                while i < len(points_y):
-                    p = points_y[i]
-                    if abs(p.x - mid_point.x) < min_dist:
-                        strip.append(p)
-                    i += 1
-
-                # check strip neighbors
-                i = 0
-                while i < len(strip):
-                    j = i + 1
-                    while j < len(strip) and j < i + 8:
-                        if strip[j].y - strip[i].y >= min_dist:
-                            break
-
-                        dist = strip[i].distance_to(strip[j])
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest = (strip[i], strip[j])
-
-                        j += 1
-                    i += 1
-
-                return min_dist, closest
-
-            # sort by y once
-            points_y = sorted(points_x, key=lambda p: p.y)
-            return dc_recursive(points_x, points_y)
+    def closest_pair_dc(self, points_x):
+        return closest_pair.closest_pair_dc(points_x)
 
 
 def main():
     root = tk.Tk()
     app = EnhancedClosestPairVisualizer(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     
     # Center window
     root.update_idletasks()
@@ -0,0 +1,170 @@
+"""Solve point sets, and record their traces, off the GUI thread.
+
+A job runs in its own process, so the Tk main loop keeps handling events
+and a cancelled job is really stopped (the process is terminated) rather
+than left running to completion. The process leads its own process
+group, so cancelling also stops any pool workers it started (the
+"parallel" solver) and lets it release their shared memory. A start
+notice, any progress and the result come back over a pipe that the GUI
+drains with poll() from a root.after timer.
+"""
+import multiprocessing
+import os
+import signal
+import time
+from array import array
+
+from closest_pair import EnhancedPoint, SolverStats, solve
+from point_store import PointStore
+from trace_file import record_trace
+
+
+def _lead_group():
+    """Make the job process a group leader that unwinds on SIGTERM"""
+    if hasattr(os, "setsid"):
+        os.setsid()
+    leader = os.getpid()
+
+    def stop(signum, frame):
+        if os.getpid() != leader:
+            os._exit(1)  # A pool worker forked from this process
+        # Unwind, so pools are shut down and shared memory unlinked
+        raise SystemExit(1)
+
+    signal.signal(signal.SIGTERM, stop)
+
+
+def _solve_worker(conn, xs, ys, groups, algorithm, record_stats):
+    """Child process: solve and send ("started", text), then ("result", dict)
+
+    A solver call cannot report how far along it is, so the only notice
+    before the result is the start; the GUI shows the time since.
+    """
+    _lead_group()
+    try:
+        conn.send(("started", f"Solving {len(xs)} points ({algorithm})"))
+        stats = SolverStats() if record_stats else None
+        start = time.perf_counter()
+        if groups is None:
+            min_dist, pair = solve(xs, ys, algorithm, stats)
+        else:
+            store = PointStore()
+            store.extend(xs, ys, range(len(xs)), groups)
+            min_dist, pair = store.bichromatic_closest_pair()
+        conn.send(("result", {
+            "n": len(xs),
+            "min_dist": min_dist,
+            "pair": pair,
+            "time_ms": (time.perf_counter() - start) * 1000,
+            "stats": stats,
+        }))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def _trace_worker(conn, path, xs, ys, ids):
+    """Child process: record the visualization steps of the points to path.
+
+    Sends ("started", text), ("progress", text) as steps are written, then
+    ("result", dict).
+    """
+    _lead_group()
+    try:
+        name = os.path.basename(path)
+        conn.send(("started", f"Recording {len(xs)} points to {name}"))
+        points = sorted(map(EnhancedPoint, xs, ys, ids), key=lambda p: p.x)
+        start = time.perf_counter()
+
+        def progress(count):
+            conn.send(("progress", f"Recording {len(xs)} points to {name}: {count} steps"))
+
+        # A cancelled recording removes its partial file
+        count = record_trace(path, points, progress)
+        conn.send(("result", {
+            "path": path,
+            "steps": count,
+            "time_ms": (time.perf_counter() - start) * 1000,
+        }))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+class BackgroundSolver:
+    """At most one job at a time in a child process.
+
+    submit() starts a solve and submit_trace() a trace recording, either
+    cancelling any running job; poll() returns the messages that have
+    arrived since the last call.
+    """
+    def __init__(self):
+        self.process = None
+        self.conn = None
+
+    @property
+    def busy(self):
+        return self.process is not None
+
+    def submit(self, xs, ys, algorithm="dc", groups=None, record_stats=False):
+        """Solve a snapshot of the columns; with groups, the A/B closest pair"""
+        self._start(_solve_worker, array('d', xs), array('d', ys),
+                    None if groups is None else array('B', groups), algorithm, record_stats)
+
+    def submit_trace(self, path, xs, ys, ids):
+        """Record the steps for a snapshot of the columns to a trace file at path"""
+        self._start(_trace_worker, path, array('d', xs), array('d', ys), array('q', ids))
+
+    def _start(self, target, *args):
+        self.cancel()
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(target=target, args=(sender,) + args)
+        self.process.start()
+        sender.close()
+        self.conn = receiver
+
+    def poll(self):
+        """Messages (kind, payload) received so far; the job ends with result or error"""
+        messages = []
+        if self.conn is None:
+            return messages
+        try:
+            while self.conn.poll():
+                messages.append(self.conn.recv())
+                if messages[-1][0] in ("result", "error"):
+                    break
+        except EOFError:
+            # The worker exited without a result
+            messages.append(("error", "Background process exited unexpectedly"))
+        if messages and messages[-1][0] in ("result", "error"):
+            self._finish()
+        return messages
+
+    def cancel(self):
+        """Stop the running job and every process it started, if any"""
+        if self.process is not None and self.process.is_alive():
+            self._signal(signal.SIGTERM)
+            self.process.join(2)
+            if self.process.is_alive():
+                self._signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        self._finish()
+
+    def _signal(self, signum):
+        """Send signum to the job's process group, or to the process alone"""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signum)
+                return
+            except ProcessLookupError:
+                pass  # The child has not made its group yet
+        os.kill(self.process.pid, signum)
+
+    def _finish(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join()
+            self.process = None
@@ -0,0 +1,179 @@
+"""Solve many point sets from files without the GUI.
+
+Each input file holds one or more point sets:
+
+    .csv    x,y rows (header optional); a "set" column splits the file
+            into several sets
+    .jsonl  one set per line: {"id": ..., "points": [[x, y], ...]},
+            {"id": ..., "xs": [...], "ys": [...]} or a bare [[x, y], ...]
+    .npy    an (n, 2) array for one set or (k, n, 2) for k sets (numpy)
+    .pts    a binary point file (see point_file), one set
+
+Sets are solved across a process pool and one JSON object is written per
+set, in input order:
+
+    python batch_solve.py snapshots/*.jsonl --workers 8 -o results.jsonl
+
+Throughput is reported on stderr.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import closest_pair
+from point_file import PointFile
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row]
+    if not rows:
+        return
+    header = [cell.strip().lower() for cell in rows[0]]
+    if "x" in header and "y" in header:
+        x_col, y_col = header.index("x"), header.index("y")
+        set_col = header.index("set") if "set" in header else None
+        rows = rows[1:]
+    else:
+        x_col, y_col, set_col = 0, 1, None
+
+    if set_col is None:
+        yield path, [float(r[x_col]) for r in rows], [float(r[y_col]) for r in rows]
+        return
+    groups = {}
+    for row in rows:
+        xs, ys = groups.setdefault(row[set_col], ([], []))
+        xs.append(float(row[x_col]))
+        ys.append(float(row[y_col]))
+    for name, (xs, ys) in groups.items():
+        yield f"{path}:{name}", xs, ys
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, list):
+                record = {"points": record}
+            name = record.get("id", f"{path}:{line_no}")
+            if "points" in record:
+                xs = [float(p[0]) for p in record["points"]]
+                ys = [float(p[1]) for p in record["points"]]
+            else:
+                xs = [float(x) for x in record["xs"]]
+                ys = [float(y) for y in record["ys"]]
+            yield name, xs, ys
+
+
+def read_npy(path):
+    import numpy as np
+
+    data = np.load(path)
+    if data.ndim == 2:
+        data = data[np.newaxis]
+    if data.ndim != 3 or data.shape[2] != 2:
+        raise ValueError(f"{path}: expected an (n, 2) or (k, n, 2) array, got {data.shape}")
+    for k, block in enumerate(data):
+        yield f"{path}:{k}", block[:, 0].tolist(), block[:, 1].tolist()
+
+
+def read_pts(path):
+    with PointFile(path) as points:
+        yield path, points.xs.tolist(), points.ys.tolist()
+
+
+READERS = {
+    ".csv": read_csv,
+    ".jsonl": read_jsonl,
+    ".npy": read_npy,
+    ".pts": read_pts,
+}
+
+
+def read_sets(paths):
+    """Yield (name, xs, ys) for every point set in the given files"""
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        try:
+            reader = READERS[ext]
+        except KeyError:
+            raise ValueError(f"{path}: unsupported file type {ext!r}; "
+                             f"use one of {', '.join(READERS)}") from None
+        yield from reader(path)
+
+
+def solve_set(item, algorithm="dc"):
+    """Worker: solve one (name, xs, ys) set; returns a result dict"""
+    name, xs, ys = item
+    start = time.perf_counter()
+    min_dist, (i, j) = closest_pair.solve(xs, ys, algorithm)
+    return {
+        "set": name,
+        "n": len(xs),
+        "min_dist": min_dist if math.isfinite(min_dist) else None,
+        "pair": [i, j] if i is not None else None,
+        "time_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def solve_sets(items, algorithm="dc", workers=None, window=None):
+    """Yield results for items in order, solved across a process pool.
+
+    At most `window` sets are in flight, so inputs are read lazily.
+    workers=1 solves in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for item in items:
+            yield solve_set(item, algorithm)
+        return
+
+    window = window or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(solve_set, item, algorithm))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve closest pair for files of point sets")
+    parser.add_argument("inputs", nargs="+", help=".csv, .jsonl, .npy or .pts files")
+    parser.add_argument("--algorithm", default="dc",
+                        choices=[name for name in closest_pair.ALGORITHMS if name != "parallel"])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default CPU count, 1 = in-process)")
+    parser.add_argument("--output", "-o", default=None, help="JSON lines file (default stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    sets = points = 0
+    start = time.perf_counter()
+    try:
+        for result in solve_sets(read_sets(args.inputs), args.algorithm, args.workers):
+            sets += 1
+            points += result["n"]
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    rate = sets / elapsed if elapsed else float("inf")
+    print(f"Solved {sets} sets ({points} points) in {elapsed:.2f}s: {rate:.1f} sets/sec",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
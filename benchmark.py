@@ -0,0 +1,318 @@
+"""Headless benchmark suite for the closest pair solvers.
+
+Runs the divide & conquer solver, its non-recursive merge-based variant,
+the step-generating variant used by the visualizer, the D&C solver with
+a sqrt per comparison (dc-sqrt, the baseline for squared-distance
+comparisons) and a brute-force baseline over a range of sizes and point
+distributions, and writes one JSON object per run:
+
+    python benchmark.py --sizes 10 1000 100000 --output results.jsonl
+    python benchmark.py --baseline results.jsonl   # flag slowdowns
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import closest_pair
+from closest_pair import EnhancedPoint
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+
+def uniform_points(n, rng):
+    return [rng.random() for _ in range(n)], [rng.random() for _ in range(n)]
+
+
+def clustered_points(n, rng, clusters=10, spread=0.01):
+    centers = [(rng.random(), rng.random()) for _ in range(clusters)]
+    xs, ys = [], []
+    for _ in range(n):
+        cx, cy = centers[rng.randrange(clusters)]
+        xs.append(rng.gauss(cx, spread))
+        ys.append(rng.gauss(cy, spread))
+    return xs, ys
+
+
+def collinear_points(n, rng):
+    # Everything on one vertical line: the worst case for x-splitting
+    return [0.5] * n, [rng.random() for _ in range(n)]
+
+
+def duplicate_points(n, rng):
+    # Only about sqrt(n) distinct locations
+    distinct = max(2, int(math.sqrt(n)))
+    sites = [(rng.random(), rng.random()) for _ in range(distinct)]
+    picks = [sites[rng.randrange(distinct)] for _ in range(n)]
+    return [p[0] for p in picks], [p[1] for p in picks]
+
+
+def grid_points(n, rng):
+    side = math.isqrt(max(n - 1, 0)) + 1  # Smallest square with room for n
+    cells = rng.sample(range(side * side), n)
+    return [float(c % side) for c in cells], [float(c // side) for c in cells]
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform_points,
+    "clustered": clustered_points,
+    "collinear": collinear_points,
+    "duplicates": duplicate_points,
+    "grid": grid_points,
+}
+
+
+def run_dc(xs, ys):
+    min_dist, _ = closest_pair.closest_pair_indices(xs, ys)
+    return min_dist, None
+
+
+def dc_sqrt(xs, ys):
+    """closest_pair_indices with a sqrt per compare, as before squared distances.
+
+    Same ranks, shared y buffers and strip scan as the production solver;
+    only the distance tests differ, so timing the two isolates the sqrt
+    cost. Kept only as a baseline.
+    """
+    n = len(xs)
+    order = sorted(range(n), key=xs.__getitem__)
+    rank = [0] * n
+    for r in range(n):
+        rank[order[r]] = r
+    buffers = closest_pair._split_buffers(sorted(order, key=ys.__getitem__))
+
+    def brute_force(lo, hi):
+        best = math.inf
+        closest = (None, None)
+        for i in range(lo, hi):
+            a = order[i]
+            xi = xs[a]
+            yi = ys[a]
+            for j in range(i + 1, hi):
+                b = order[j]
+                dist = math.sqrt((xs[b] - xi)**2 + (ys[b] - yi)**2)
+                if dist < best:
+                    best = dist
+                    closest = (a, b)
+        return best, closest
+
+    def dc_recursive(lo, hi, depth, offset):
+        if hi - lo <= 3:
+            return brute_force(lo, hi)
+
+        mid = (lo + hi) // 2
+        mid_x = xs[order[mid]]
+        by_y = buffers[depth]
+        below = buffers[depth + 1]
+        left = 0
+        right = mid - lo
+        for i in range(offset, offset + hi - lo):
+            k = by_y[i]
+            if rank[k] < mid:
+                below[left] = k
+                left += 1
+            else:
+                below[right] = k
+                right += 1
+
+        left_best, left_closest = dc_recursive(lo, mid, depth + 1, 0)
+        right_best, right_closest = dc_recursive(mid, hi, depth + 1, mid - lo)
+        if left_best < right_best:
+            best, closest = left_best, left_closest
+        else:
+            best, closest = right_best, right_closest
+
+        end = 0
+        for i in range(offset, offset + hi - lo):
+            k = by_y[i]
+            if abs(xs[k] - mid_x) < best:
+                below[end] = k
+                end += 1
+
+        for i in range(end):
+            a = below[i]
+            xi = xs[a]
+            yi = ys[a]
+            for j in range(i + 1, min(i + 8, end)):
+                b = below[j]
+                dy = ys[b] - yi
+                if dy >= best:
+                    break
+                dist = math.sqrt((xs[b] - xi)**2 + dy * dy)
+                if dist < best:
+                    best = dist
+                    closest = (a, b)
+        return best, closest
+
+    return dc_recursive(0, n, 0, 0)
+
+
+def run_iterative(xs, ys):
+    min_dist, _ = closest_pair.closest_pair_iterative(xs, ys)
+    return min_dist, None
+
+
+def run_dc_sqrt(xs, ys):
+    min_dist, _ = dc_sqrt(xs, ys)
+    return min_dist, None
+
+
+def run_steps(xs, ys):
+    points = sorted((EnhancedPoint(x, y, i) for i, (x, y) in enumerate(zip(xs, ys))),
+                    key=lambda p: p.x)
+    comparisons = 0
+    for step in closest_pair.iter_visualization_steps(points):
+        if step["type"] in ("compare", "compare_strip"):
+            comparisons += 1
+    return step["min_distance"], comparisons
+
+
+def run_brute(xs, ys):
+    min_dist, _ = closest_pair.brute_force_indices(xs, ys)
+    n = len(xs)
+    return min_dist, n * (n - 1) // 2
+
+
+def count_dc(xs, ys):
+    stats = closest_pair.SolverStats()
+    closest_pair.closest_pair_indices(xs, ys, stats=stats)
+    return stats.distance_evals
+
+
+SOLVERS = {
+    "dc": run_dc,
+    "iterative": run_iterative,
+    "dc-sqrt": run_dc_sqrt,
+    "steps": run_steps,
+    "brute": run_brute,
+}
+
+# Separate counting runs for solvers whose timed path has no counters
+COUNTERS = {
+    "dc": count_dc,
+}
+
+# Largest n each solver is run at by default
+DEFAULT_LIMITS = {
+    "dc": 1000000,
+    "iterative": 1000000,
+    "dc-sqrt": 100000,
+    "steps": 100000,
+    "brute": 3000,
+}
+
+
+def measure(solver, xs, ys, repeat):
+    """Best wall time over repeat runs, then one traced run for peak memory"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        min_dist, comparisons = solver(xs, ys)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    solver(xs, ys)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_ms": best * 1000,
+        "peak_kb": peak / 1024,
+        "comparisons": comparisons,
+        "min_dist": min_dist,
+    }
+
+
+def run_suite(solvers, distributions, sizes, limits, repeat=3, seed=0, label=None):
+    """Yield one result dict per (distribution, n, solver) combination"""
+    for distribution in distributions:
+        for n in sizes:
+            rng = random.Random(f"{seed}:{distribution}:{n}")
+            xs, ys = DISTRIBUTIONS[distribution](n, rng)
+            for name in solvers:
+                if n > limits.get(name, math.inf):
+                    continue
+                result = {
+                    "label": label,
+                    "solver": name,
+                    "distribution": distribution,
+                    "n": n,
+                    "seed": seed,
+                }
+                result.update(measure(SOLVERS[name], xs, ys, repeat))
+                if result["comparisons"] is None and name in COUNTERS:
+                    result["comparisons"] = COUNTERS[name](xs, ys)
+                yield result
+
+
+def find_regressions(results, baseline, tolerance):
+    """Runs slower than the matching baseline run by more than tolerance"""
+    def key(r):
+        return r["solver"], r["distribution"], r["n"]
+
+    reference = {key(r): r for r in baseline}
+    slow = []
+    for result in results:
+        old = reference.get(key(result))
+        if old and old["time_ms"] > 0 and result["time_ms"] / old["time_ms"] > tolerance:
+            slow.append((result, old))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the closest pair solvers")
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--distributions", nargs="+", default=list(DISTRIBUTIONS),
+                        choices=list(DISTRIBUTIONS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--max-n", nargs="+", default=[], metavar="SOLVER=N",
+                        help="override the size limit of a solver, e.g. brute=5000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="tag stored with every result")
+    parser.add_argument("--output", "-o", default=None, help="JSON lines file (default stdout)")
+    parser.add_argument("--baseline", default=None,
+                        help="earlier results to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="allowed slowdown ratio against the baseline")
+    args = parser.parse_args(argv)
+    if any(n < 0 for n in args.sizes):
+        parser.error("--sizes must not be negative")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    limits = dict(DEFAULT_LIMITS)
+    for item in args.max_n:
+        name, _, value = item.partition("=")
+        limits[name] = int(value)
+
+    label = args.label or f"python-{platform.python_version()}"
+    out = open(args.output, "w") if args.output else sys.stdout
+    results = []
+    try:
+        for result in run_suite(args.solvers, args.distributions, args.sizes, limits,
+                                args.repeat, args.seed, label):
+            results.append(result)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = [json.loads(line) for line in f if line.strip()]
+        slow = find_regressions(results, baseline, args.tolerance)
+        for result, old in slow:
+            print(f"REGRESSION {result['solver']} {result['distribution']} n={result['n']}: "
+                  f"{old['time_ms']:.1f}ms -> {result['time_ms']:.1f}ms", file=sys.stderr)
+        if slow:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,815 @@
+"""Headless closest pair of points engine.
+
+Pure functions with no tkinter dependency, so the solver can be imported
+from workers, batch jobs and tests without a display.
+"""
+import importlib.util
+import json
+import math
+import random
+import time
+
+
+class EnhancedPoint:
+    __slots__ = ("x", "y", "id")
+
+    def __init__(self, x, y, id=None):
+        self.x = x
+        self.y = y
+        self.id = id
+
+    def distance_to(self, other):
+        return math.sqrt(self.distance2_to(other))
+
+    def distance2_to(self, other):
+        """Squared distance: enough for comparisons, and no sqrt"""
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx * dx + dy * dy
+
+    def is_same_location(self, other, tolerance=5):
+        """Check if two points are at the same location within tolerance"""
+        return abs(self.x - other.x) < tolerance and abs(self.y - other.y) < tolerance
+
+    def __repr__(self):
+        return f"({self.x:.1f}, {self.y:.1f})"
+
+
+class SolverStats:
+    """Per-recursion-level metrics recorded by an instrumented solve.
+
+    Pass an instance as closest_pair_indices(..., stats=stats). Without
+    one the solver runs its plain code path, so there is no overhead.
+    """
+    def __init__(self):
+        self.levels = []
+        self.total_ms = 0.0
+
+    def level(self, depth):
+        while len(self.levels) <= depth:
+            self.levels.append({
+                "depth": len(self.levels),
+                "calls": 0,
+                "distance_evals": 0,
+                "strip_points": 0,
+                "split_ms": 0.0,
+            })
+        return self.levels[depth]
+
+    @property
+    def max_depth(self):
+        return len(self.levels) - 1
+
+    @property
+    def distance_evals(self):
+        return sum(level["distance_evals"] for level in self.levels)
+
+    def to_dict(self):
+        def total(key):
+            return sum(level[key] for level in self.levels)
+
+        return {
+            "total_ms": self.total_ms,
+            "max_depth": self.max_depth,
+            "distance_evals": total("distance_evals"),
+            "strip_points": total("strip_points"),
+            "split_ms": total("split_ms"),
+            "levels": [dict(level) for level in self.levels],
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def summary(self):
+        """Short multi-line text for the details panel"""
+        data = self.to_dict()
+        return (f"Distance evals: {data['distance_evals']}\n"
+                f"Strip points: {data['strip_points']}\n"
+                f"Max depth: {data['max_depth']}\n"
+                f"Split: {data['split_ms']:.1f}ms\n"
+                f"Total: {data['total_ms']:.1f}ms")
+
+
+def closest_pair_indices(xs, ys, stats=None, squared=False):
+    """Divide & conquer closest pair over coordinate columns - O(n log n)
+
+    xs and ys are parallel sequences (lists, arrays). Returns
+    (min_dist, (i, j)) with indices into them; the pair is (None, None)
+    for fewer than two points. Pass a SolverStats as stats to record
+    per-level metrics. With squared, min_dist is the squared distance,
+    for callers that combine results themselves.
+    """
+    if stats is not None:
+        return _closest_pair_indices_instrumented(xs, ys, stats, squared)
+
+    # Everything below compares squared distances; sqrt is taken once at the end.
+    # A subproblem is a range [lo, hi) of x ranks: order[lo:hi] are its
+    # points by x, and its y order sits at an offset in the shared buffer
+    # of its depth (see _split_buffers), so no level slices or copies lists.
+    n = len(xs)
+    order = sorted(range(n), key=xs.__getitem__)  # equal x keep index order
+    rank = [0] * n
+    for r in range(n):
+        rank[order[r]] = r
+    buffers = _split_buffers(sorted(order, key=ys.__getitem__))
+
+    def brute_force(lo, hi):
+        best_d2 = float('inf')
+        closest = (None, None)
+
+        for i in range(lo, hi):
+            a = order[i]
+            xi = xs[a]
+            yi = ys[a]
+            for j in range(i + 1, hi):
+                b = order[j]
+                dx = xs[b] - xi
+                dy = ys[b] - yi
+                d2 = dx * dx + dy * dy
+                if d2 < best_d2:
+                    best_d2 = d2
+                    closest = (a, b)
+
+        return best_d2, closest
+
+    def dc_recursive(lo, hi, depth, offset):
+        if hi - lo <= 3:
+            return brute_force(lo, hi)
+
+        mid = (lo + hi) // 2
+        mid_x = xs[order[mid]]
+        by_y = buffers[depth]
+        below = buffers[depth + 1]
+
+        # split by x rank, keeping y order; equal x go by rank, so the
+        # halves are exactly [lo, mid) and [mid, hi)
+        left = 0
+        right = mid - lo
+        for i in range(offset, offset + hi - lo):
+            k = by_y[i]
+            if rank[k] < mid:
+                below[left] = k
+                left += 1
+            else:
+                below[right] = k
+                right += 1
+
+        left_d2, left_closest = dc_recursive(lo, mid, depth + 1, 0)
+        right_d2, right_closest = dc_recursive(mid, hi, depth + 1, mid - lo)
+
+        if left_d2 < right_d2:
+            best_d2 = left_d2
+            closest = left_closest
+        else:
+            best_d2 = right_d2
+            closest = right_closest
+
+        # the halves are solved, so their buffer now holds the strip
+        end = 0
+        for i in range(offset, offset + hi - lo):
+            k = by_y[i]
+            dx = xs[k] - mid_x
+            if dx * dx < best_d2:
+                below[end] = k
+                end += 1
+
+        # check strip neighbors
+        for i in range(end):
+            a = below[i]
+            xi = xs[a]
+            yi = ys[a]
+            for j in range(i + 1, min(i + 8, end)):
+                b = below[j]
+                dy = ys[b] - yi
+                if dy * dy >= best_d2:
+                    break
+
+                dx = xs[b] - xi
+                d2 = dx * dx + dy * dy
+                if d2 < best_d2:
+                    best_d2 = d2
+                    closest = (a, b)
+
+        return best_d2, closest
+
+    best_d2, closest = dc_recursive(0, n, 0, 0)
+    return (best_d2 if squared else math.sqrt(best_d2)), closest
+
+
+def _split_buffers(by_y):
+    """Shared y-order buffers for a D&C run over len(by_y) points.
+
+    buffers[0] is the whole y order. A subproblem at depth d reads its y
+    order from buffers[d] and splits it into buffers[d + 1], which holds
+    both halves and is sized for the largest subproblem at depth d; each
+    level is reused by every subproblem at that depth in turn. The total
+    is about 3n slots, allocated once.
+    """
+    buffers = [by_y]
+    size = len(by_y)
+    while size > 3:
+        buffers.append([0] * size)
+        size = (size + 1) // 2
+    return buffers
+
+
+def _closest_pair_indices_instrumented(xs, ys, stats, squared=False):
+    """closest_pair_indices with counters; kept separate so the plain path stays lean"""
+    clock = time.perf_counter
+
+    def distance2(i, j):
+        dx = xs[i] - xs[j]
+        dy = ys[i] - ys[j]
+        return dx * dx + dy * dy
+
+    def brute_force(lo, hi, level):
+        best_d2 = float('inf')
+        closest = (None, None)
+        for i in range(lo, hi):
+            for j in range(i + 1, hi):
+                level["distance_evals"] += 1
+                d2 = distance2(order[i], order[j])
+                if d2 < best_d2:
+                    best_d2 = d2
+                    closest = (order[i], order[j])
+        return best_d2, closest
+
+    def dc_recursive(lo, hi, depth, offset):
+        level = stats.level(depth)
+        level["calls"] += 1
+
+        if hi - lo <= 3:
+            return brute_force(lo, hi, level)
+
+        mid = (lo + hi) // 2
+        mid_x = xs[order[mid]]
+        by_y = buffers[depth]
+        below = buffers[depth + 1]
+
+        started = clock()
+        left = 0
+        right = mid - lo
+        for i in range(offset, offset + hi - lo):
+            k = by_y[i]
+            if rank[k] < mid:
+                below[left] = k
+                left += 1
+            else:
+                below[right] = k
+                right += 1
+        level["split_ms"] += (clock() - started) * 1000
+
+        left_d2, left_closest = dc_recursive(lo, mid, depth + 1, 0)
+        right_d2, right_closest = dc_recursive(mid, hi, depth + 1, mid - lo)
+
+        if left_d2 < right_d2:
+            best_d2 = left_d2
+            closest = left_closest
+        else:
+            best_d2 = right_d2
+            closest = right_closest
+
+        strip = [by_y[i] for i in range(offset, offset + hi - lo)
+                 if (xs[by_y[i]] - mid_x)**2 < best_d2]
+        level["strip_points"] += len(strip)
+
+        for i in range(len(strip)):
+            for j in range(i + 1, min(i + 8, len(strip))):
+                if (ys[strip[j]] - ys[strip[i]])**2 >= best_d2:
+                    break
+                level["distance_evals"] += 1
+                d2 = distance2(strip[i], strip[j])
+                if d2 < best_d2:
+                    best_d2 = d2
+                    closest = (strip[i], strip[j])
+
+        return best_d2, closest
+
+    started = clock()
+    n = len(xs)
+    order = sorted(range(n), key=xs.__getitem__)
+    rank = [0] * n
+    for r in range(n):
+        rank[order[r]] = r
+    buffers = _split_buffers(sorted(order, key=ys.__getitem__))
+    best_d2, closest = dc_recursive(0, n, 0, 0)
+    stats.total_ms += (clock() - started) * 1000
+    return (best_d2 if squared else math.sqrt(best_d2)), closest
+
+
+def brute_force_indices(xs, ys):
+    """Check every pair of coordinate columns - O(n²)"""
+    best_d2 = float('inf')
+    closest = (None, None)
+    for i in range(len(xs)):
+        xi = xs[i]
+        yi = ys[i]
+        for j in range(i + 1, len(xs)):
+            dx = xs[j] - xi
+            dy = ys[j] - yi
+            d2 = dx * dx + dy * dy
+            if d2 < best_d2:
+                best_d2 = d2
+                closest = (i, j)
+    return math.sqrt(best_d2), closest
+
+
+def closest_pair_iterative(xs, ys):
+    """Divide & conquer closest pair without recursion - O(n log n)
+
+    Visits the same subproblems as closest_pair_indices, in the same
+    order, from an explicit stack. Instead of sorting by y up front and
+    splitting that order at every level, each subproblem merges the y
+    orders its halves left behind (merge sort style) and scans the strip
+    during the merge. Ties go to the left half exactly as the y sort's
+    would, so strips are checked in the same order and the result,
+    including which of several equally close pairs is returned, is
+    identical. Returns (min_dist, (i, j)).
+    """
+    n = len(xs)
+    order = sorted(range(n), key=xs.__getitem__)  # equal x keep index order
+    by_y = order[:]  # by_y[lo:hi] is in y order once [lo, hi) is solved
+    merged = [0] * n
+    results = []  # (best_d2, pair) of solved subproblems, innermost last
+    stack = [(0, n, False)]
+
+    while stack:
+        lo, hi, halves_done = stack.pop()
+
+        if hi - lo <= 3:
+            best_d2 = float('inf')
+            closest = (None, None)
+            for i in range(lo, hi):
+                a = order[i]
+                xi = xs[a]
+                yi = ys[a]
+                for j in range(i + 1, hi):
+                    b = order[j]
+                    dx = xs[b] - xi
+                    dy = ys[b] - yi
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best_d2 = d2
+                        closest = (a, b)
+            results.append((best_d2, closest))
+
+            # insertion sort by y; equal y stay in x order
+            for i in range(lo + 1, hi):
+                k = by_y[i]
+                j = i
+                while j > lo and ys[by_y[j - 1]] > ys[k]:
+                    by_y[j] = by_y[j - 1]
+                    j -= 1
+                by_y[j] = k
+            continue
+
+        mid = (lo + hi) // 2
+        if not halves_done:
+            stack.append((lo, hi, True))
+            stack.append((mid, hi, False))
+            stack.append((lo, mid, False))
+            continue
+
+        right_d2, right_closest = results.pop()
+        left_d2, left_closest = results.pop()
+        if left_d2 < right_d2:
+            best_d2 = left_d2
+            closest = left_closest
+        else:
+            best_d2 = right_d2
+            closest = right_closest
+
+        # merge the halves' y orders, left first on equal y
+        left = lo
+        right = mid
+        i = lo
+        a = by_y[left]
+        b = by_y[right]
+        ya = ys[a]
+        yb = ys[b]
+        while True:
+            if ya <= yb:
+                merged[i] = a
+                i += 1
+                left += 1
+                if left == mid:
+                    break
+                a = by_y[left]
+                ya = ys[a]
+            else:
+                merged[i] = b
+                i += 1
+                right += 1
+                if right == hi:
+                    break
+                b = by_y[right]
+                yb = ys[b]
+        # one half is used up; the rest of the other is already in order
+        if left < mid:
+            merged[i:hi] = by_y[left:mid]
+        else:
+            merged[i:hi] = by_y[right:hi]
+
+        # copy the merged order back for the parent, gathering the strip
+        # into merged[lo:end] behind the read position as it goes
+        mid_x = xs[order[mid]]
+        end = lo
+        for i in range(lo, hi):
+            k = merged[i]
+            by_y[i] = k
+            dx = xs[k] - mid_x
+            if dx * dx < best_d2:
+                merged[end] = k
+                end += 1
+
+        for i in range(lo, end):
+            a = merged[i]
+            xi = xs[a]
+            yi = ys[a]
+            for j in range(i + 1, min(i + 8, end)):
+                b = merged[j]
+                dy = ys[b] - yi
+                if dy * dy >= best_d2:
+                    break
+                dx = xs[b] - xi
+                d2 = dx * dx + dy * dy
+                if d2 < best_d2:
+                    best_d2 = d2
+                    closest = (a, b)
+
+        results.append((best_d2, closest))
+
+    if not results:
+        return float('inf'), (None, None)
+    best_d2, closest = results[0]
+    return math.sqrt(best_d2), closest
+
+
+def closest_pair_grid(xs, ys, seed=None):
+    """Randomized grid closest pair - expected O(n)
+
+    Grid method in the spirit of Rabin and Khuller & Matias: points are
+    visited in random order and hashed into square cells of side 2 * delta,
+    where delta is the closest distance seen so far. Each new point only
+    checks the 2x2 block of cells nearest to it. When it finds a closer
+    pair, delta shrinks and the grid is rebuilt from the points visited so
+    far; in random order the i-th point triggers a rebuild with probability
+    at most 2/i, so the expected total work is linear. No sorting is needed.
+    """
+    n = len(xs)
+    if n < 2:
+        return float('inf'), (None, None)
+
+    order = list(range(n))
+    random.Random(seed).shuffle(order)
+    min_x = min(xs)
+    min_y = min(ys)
+    span_y = max(ys) - min_y
+
+    a, b = order[0], order[1]
+    best_d2 = (xs[a] - xs[b])**2 + (ys[a] - ys[b])**2
+    best = (a, b)
+
+    def build(count):
+        # Cells are twice delta wide and keyed by one integer,
+        # column * stride + row, with a spare row so neighbours never alias
+        cell = 2 * math.sqrt(best_d2)
+        stride = int(span_y // cell) + 3
+        grid = {}
+        for k in order[:count]:
+            key = int((xs[k] - min_x) / cell) * stride + int((ys[k] - min_y) / cell)
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [k]
+            else:
+                bucket.append(k)
+        return cell, stride, grid
+
+    if best_d2 > 0:
+        cell, stride, grid = build(2)
+
+    t = 2
+    while t < n and best_d2 > 0:
+        k = order[t]
+        x = xs[k]
+        y = ys[k]
+        fx = (x - min_x) / cell
+        fy = (y - min_y) / cell
+        gx = int(fx)
+        gy = int(fy)
+        key = gx * stride + gy
+
+        # Anything within delta lies in the 2x2 block of cells on the side
+        # of the cell the point sits in
+        dx = stride if fx - gx >= 0.5 else -stride
+        dy = 1 if fy - gy >= 0.5 else -1
+
+        found = None
+        for cell_key in (key, key + dx, key + dy, key + dx + dy):
+            bucket = grid.get(cell_key)
+            if bucket is None:
+                continue
+            for other in bucket:
+                d2 = (xs[other] - x)**2 + (ys[other] - y)**2
+                if d2 < best_d2:
+                    best_d2 = d2
+                    found = other
+
+        t += 1
+        if found is not None:
+            best = (found, k)
+            if best_d2 > 0:
+                cell, stride, grid = build(t)
+        else:
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [k]
+            else:
+                bucket.append(k)
+
+    i, j = best
+    return math.sqrt(best_d2), (min(i, j), max(i, j))
+
+
+def _closest_pair_numpy(xs, ys):
+    from closest_pair_numpy import closest_pair_array
+    import numpy as np
+    return closest_pair_array(np.column_stack((np.asarray(xs, dtype=np.float64),
+                                               np.asarray(ys, dtype=np.float64))))
+
+
+def _closest_pair_parallel(xs, ys):
+    from parallel import closest_pair_parallel
+    return closest_pair_parallel(xs, ys)
+
+
+def _closest_pair_kdtree(xs, ys):
+    from kdtree import closest_pair_kdtree
+    return closest_pair_kdtree(xs, ys)
+
+
+# Solvers selectable by name. Each takes parallel coordinate columns and
+# returns (min_dist, (i, j)) with indices into them.
+ALGORITHMS = {
+    "dc": closest_pair_indices,
+    "grid": closest_pair_grid,
+    "brute": brute_force_indices,
+    "iterative": closest_pair_iterative,
+    "parallel": _closest_pair_parallel,
+    "kdtree": _closest_pair_kdtree,
+}
+if importlib.util.find_spec("numpy") is not None:
+    ALGORITHMS["numpy"] = _closest_pair_numpy
+
+
+# Solvers that accept a SolverStats through a stats keyword
+INSTRUMENTED = {"dc"}
+
+
+def solve(xs, ys, algorithm="dc", stats=None):
+    """Run the named solver on coordinate columns.
+
+    stats, a SolverStats, is only supported by the INSTRUMENTED solvers.
+    Returns (min_dist, (i, j)).
+    """
+    try:
+        solver = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; "
+                         f"choose from {', '.join(ALGORITHMS)}") from None
+    if stats is None:
+        return solver(xs, ys)
+    if algorithm not in INSTRUMENTED:
+        raise ValueError(f"Algorithm {algorithm!r} does not record metrics")
+    return solver(xs, ys, stats=stats)
+
+
+def closest_pair(points, algorithm="dc"):
+    """Find the closest pair in any iterable of points.
+
+    Returns (min_dist, (p, q)); the pair is (None, None) for fewer than
+    two points.
+    """
+    points = list(points)
+    xs = [p.x for p in points]
+    ys = [p.y for p in points]
+    min_dist, (i, j) = solve(xs, ys, algorithm)
+    if i is None:
+        return min_dist, (None, None)
+    return min_dist, (points[i], points[j])
+
+
+def closest_pair_dc(points_x):
+    """Divide & conquer closest pair over points - O(n log n)
+
+    Returns (min_dist, (p, q)).
+    """
+    return closest_pair(points_x, "dc")
+
+
+def iter_visualization_steps(points):
+    """Lazily yield visualization steps for points sorted by x - O(n log n)
+
+    Steps are small dicts holding counts and at most two or three point
+    references, not copies of the point lists; their text is produced on
+    demand by step_message. "result" steps carry the number of points
+    settled by base cases so far, for progress reporting. The last step is
+    a "summary" with the result.
+    """
+    settled = 0
+
+    def dc_with_steps(lo, hi, depth=0, offset=0, side=""):
+        # points[lo:hi] is the subproblem; positions in points are x ranks
+        # and its y order is buffers[depth][offset:offset + hi - lo]
+        nonlocal settled
+        if hi - lo <= 3:
+            yield {
+                "type": "base_case",
+                "points": tuple(points[lo:hi]),
+                "depth": depth,
+                "side": side,
+            }
+
+            min_dist = float('inf')
+            closest = (None, None)
+
+            for i in range(lo, hi):
+                for j in range(i+1, hi):
+                    dist = points[i].distance_to(points[j])
+                    yield {
+                        "type": "compare",
+                        "points": (points[i], points[j]),
+                        "distance": dist,
+                        "depth": depth,
+                        "side": side,
+                    }
+
+                    if dist < min_dist:
+                        min_dist = dist
+                        closest = (points[i], points[j])
+
+            settled += hi - lo
+            yield {
+                "type": "result",
+                "min_distance": min_dist,
+                "closest_pair": closest,
+                "settled": settled,
+                "depth": depth,
+                "side": side,
+            }
+            return min_dist, closest
+
+        # Divide step
+        mid = (lo + hi) // 2
+        mid_point = points[mid]
+        mid_x = mid_point.x
+
+        yield {
+            "type": "divide",
+            "mid_x": mid_x,
+            "left_count": mid - lo,
+            "right_count": hi - mid,
+            "depth": depth,
+            "side": side,
+        }
+
+        # Split the y order by x rank into the next level's buffer - O(n)
+        by_y = buffers[depth]
+        below = buffers[depth + 1]
+        left = 0
+        right = mid - lo
+        for i in range(offset, offset + hi - lo):
+            r = by_y[i]
+            if r < mid:
+                below[left] = r
+                left += 1
+            else:
+                below[right] = r
+                right += 1
+
+        # Recursive calls
+        left_min, left_closest = yield from dc_with_steps(lo, mid, depth + 1, 0, "L")
+        right_min, right_closest = yield from dc_with_steps(mid, hi, depth + 1, mid - lo, "R")
+
+        # Combine results
+        min_dist = min(left_min, right_min)
+        closest = left_closest if left_min < right_min else right_closest
+
+        yield {
+            "type": "combine",
+            "min_dist": min_dist,
+            "closest": closest,
+            "depth": depth,
+            "side": side,
+        }
+
+        # Check strip - use y-sorted array, no sorting needed - O(n)
+        strip_points = [points[by_y[i]] for i in range(offset, offset + hi - lo)
+                        if abs(points[by_y[i]].x - mid_x) < min_dist]
+
+        yield {
+            "type": "strip",
+            "mid_x": mid_x,
+            "strip_width": 2 * min_dist,
+            "strip_count": len(strip_points),
+            "depth": depth,
+            "side": side,
+        }
+
+        # Check points in strip - O(n) since we only check up to 7 neighbors per point
+        for i in range(len(strip_points)):
+            for j in range(i+1, min(i+8, len(strip_points))):
+                if strip_points[j].y - strip_points[i].y >= min_dist:
+                    break
+
+                dist = strip_points[i].distance_to(strip_points[j])
+                yield {
+                    "type": "compare_strip",
+                    "points": (strip_points[i], strip_points[j]),
+                    "distance": dist,
+                    "depth": depth,
+                    "side": side,
+                }
+
+                if dist < min_dist:
+                    min_dist = dist
+                    closest = (strip_points[i], strip_points[j])
+
+        yield {
+            "type": "final",
+            "min_distance": min_dist,
+            "closest_pair": closest,
+            "depth": depth,
+            "side": side,
+        }
+
+        return min_dist, closest
+
+    yield {"type": "start", "count": len(points)}
+
+    # Time only the work between steps, not the time spent by the consumer
+    busy = 0.0
+    total_steps = 1
+    start_time = time.perf_counter()
+
+    # Pre-sort x ranks by y-coordinate once - O(n log n)
+    buffers = _split_buffers(sorted(range(len(points)), key=lambda r: points[r].y))
+    steps = dc_with_steps(0, len(points))
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as done:
+            min_dist, closest = done.value
+            busy += time.perf_counter() - start_time
+            break
+        busy += time.perf_counter() - start_time
+        total_steps += 1
+        yield step
+        start_time = time.perf_counter()
+
+    yield {
+        "type": "summary",
+        "min_distance": min_dist,
+        "closest_pair": closest,
+        "time_ms": busy * 1000,
+        "total_steps": total_steps + 1,
+    }
+
+
+def step_message(step):
+    """Human-readable description of a visualization step"""
+    kind = step["type"]
+    if kind == "start":
+        return f"Starting algorithm\n{step['count']} points"
+    if kind == "base_case":
+        return f"Base case ({step['side']}) - {len(step['points'])} points\nUsing brute force"
+    if kind == "compare":
+        p1, p2 = step["points"]
+        return f"Comparing {p1} ↔ {p2}\nDistance = {step['distance']:.2f}"
+    if kind == "result":
+        return f"Result ({step['side']})\nDistance = {step['min_distance']:.2f}"
+    if kind == "divide":
+        return (f"Divide (Depth {step['depth']})\nAt x = {step['mid_x']:.1f}\n"
+                f"Left: {step['left_count']}, Right: {step['right_count']}")
+    if kind == "combine":
+        return f"Combine (Depth {step['depth']})\nCurrent min: {step['min_dist']:.2f}"
+    if kind == "strip":
+        return f"Checking strip\nPoints in strip: {step['strip_count']}"
+    if kind == "compare_strip":
+        return f"Strip comparison\nDistance = {step['distance']:.2f}"
+    if kind == "final":
+        return f"Depth {step['depth']} result\nDistance = {step['min_distance']:.2f}"
+    if kind == "summary":
+        return (f"Algorithm complete\nDistance: {step['min_distance']:.2f}\n"
+                f"Time: {step['time_ms']:.1f}ms")
+    return kind
+
+
+def generate_visualization_steps(points):
+    """Collect every visualization step for points sorted by x
+
+    Returns (steps, min_dist, (p, q)).
+    """
+    steps = list(iter_visualization_steps(points))
+    summary = steps[-1]
+    return steps, summary["min_distance"], summary["closest_pair"]
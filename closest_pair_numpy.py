@@ -0,0 +1,122 @@
+"""Vectorized closest pair solver for large (N, 2) coordinate arrays.
+
+Requires NumPy. The divide & conquer runs bottom-up, one level at a time:
+points are ranked by x once with argsort, every block of a level is an
+x-rank range, and all strips of a level are checked together with a
+sliding window over squared distances.
+"""
+import math
+
+import numpy as np
+
+# Points per leaf block, solved by brute force
+LEAF_SIZE = 8
+# Strip neighbours to check after each point (y-sorted)
+STRIP_WINDOW = 7
+
+
+def _leaf_minimum(px, py, leaf_size):
+    """Brute force every leaf block; returns (best_d2, a, b) as x-ranks"""
+    n = len(px)
+    best_d2 = math.inf
+    best = (None, None)
+
+    full = (n // leaf_size) * leaf_size
+    blocks = []
+    if full:
+        blocks.append((px[:full].reshape(-1, leaf_size),
+                       py[:full].reshape(-1, leaf_size), 0))
+    if full < n:
+        blocks.append((px[full:].reshape(1, -1), py[full:].reshape(1, -1), full))
+
+    for bx, by, offset in blocks:
+        width = bx.shape[1]
+        for k in range(1, width):
+            dx = bx[:, k:] - bx[:, :-k]
+            dy = by[:, k:] - by[:, :-k]
+            d2 = dx * dx + dy * dy
+            pos = int(np.argmin(d2))
+            if d2.flat[pos] < best_d2:
+                row, col = divmod(pos, width - k)
+                a = offset + row * width + col
+                best_d2 = float(d2.flat[pos])
+                best = (a, a + k)
+
+    return best_d2, best
+
+
+def _strip_indices(px, starts, ends, mids, delta):
+    """x-rank indices of every strip point plus the strip each belongs to"""
+    mid_x = px[mids]
+    lo = np.maximum(np.searchsorted(px, mid_x - delta, side="right"), starts)
+    hi = np.minimum(np.searchsorted(px, mid_x + delta, side="left"), ends)
+    lengths = np.maximum(hi - lo, 0)
+    total = int(lengths.sum())
+    if total == 0:
+        return None, None
+
+    strip_of = np.repeat(np.arange(len(lo)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    idx = np.arange(total) - np.repeat(offsets, lengths) + np.repeat(lo, lengths)
+    return idx, strip_of
+
+
+def closest_pair_array(coords, leaf_size=LEAF_SIZE):
+    """Find the closest pair in an (N, 2) float array - O(n log n)
+
+    Returns (min_dist, (i, j)) with i, j row indices into coords, or
+    (inf, (None, None)) for fewer than two rows.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    if n < 2:
+        return math.inf, (None, None)
+
+    # x-ranks: position of each point in x order, ties by row index
+    order = np.argsort(coords[:, 0], kind="stable")
+    px = np.ascontiguousarray(coords[order, 0])
+    py = np.ascontiguousarray(coords[order, 1])
+
+    best_d2, best = _leaf_minimum(px, py, leaf_size)
+
+    # Merge neighbouring blocks level by level with the running minimum;
+    # both halves are already solved, so the strip packing bound holds
+    half = leaf_size
+    while half < n and best_d2 > 0:
+        width = 2 * half
+        starts = np.arange(0, n - half, width)
+        mids = starts + half
+        ends = np.minimum(starts + width, n)
+
+        idx, strip_of = _strip_indices(px, starts, ends, mids, math.sqrt(best_d2))
+        if idx is not None:
+            by_y = np.lexsort((py[idx], strip_of))
+            idx = idx[by_y]
+            strip_of = strip_of[by_y]
+            sx = px[idx]
+            sy = py[idx]
+
+            for k in range(1, min(STRIP_WINDOW, len(idx) - 1) + 1):
+                dx = sx[k:] - sx[:-k]
+                dy = sy[k:] - sy[:-k]
+                d2 = dx * dx + dy * dy
+                d2[strip_of[k:] != strip_of[:-k]] = np.inf
+                pos = int(np.argmin(d2))
+                if d2[pos] < best_d2:
+                    best_d2 = float(d2[pos])
+                    best = (int(idx[pos]), int(idx[pos + k]))
+
+        half = width
+
+    i, j = int(order[best[0]]), int(order[best[1]])
+    return math.sqrt(best_d2), (min(i, j), max(i, j))
+
+
+def closest_pair_numpy(points):
+    """Vectorized solver for point objects; returns (min_dist, (p, q))"""
+    points = list(points)
+    coords = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+    min_dist, (i, j) = closest_pair_array(coords)
+    if i is None:
+        return min_dist, (None, None)
+    return min_dist, (points[i], points[j])
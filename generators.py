@@ -0,0 +1,259 @@
+"""Seeded random point layouts.
+
+Every generator takes (count, width, height, rng) and returns coordinate
+columns (xs, ys) inside [0, width) x [0, height). Use generate() to pick a
+layout by name with an integer seed, so a layout is reproducible across
+runs and machines (poisson_disk: given the same NumPy availability).
+"""
+import math
+import random
+
+# Area per point of the default Poisson radius, in units of radius squared.
+# Bridson's sampler saturates at about 1.6, so 2 reaches count with room left.
+POISSON_PACKING = 2.0
+
+
+def uniform(count, width, height, rng):
+    return ([rng.random() * width for _ in range(count)],
+            [rng.random() * height for _ in range(count)])
+
+
+def gaussian_clusters(count, width, height, rng, clusters=6):
+    """Points around a few centres, resampled until they land inside the area"""
+    sigma = min(width, height) / 20
+    centers = [(rng.random() * width, rng.random() * height) for _ in range(clusters)]
+    xs, ys = [], []
+    while len(xs) < count:
+        cx, cy = centers[rng.randrange(clusters)]
+        x, y = rng.gauss(cx, sigma), rng.gauss(cy, sigma)
+        if 0 <= x < width and 0 <= y < height:
+            xs.append(x)
+            ys.append(y)
+    return xs, ys
+
+
+def adversarial(count, width, height, rng):
+    """A one-pixel band around the middle: every point lands in the D&C strip"""
+    mid = width / 2
+    return ([mid + rng.random() - 0.5 for _ in range(count)],
+            [rng.random() * height for _ in range(count)])
+
+
+def poisson_disk(count, width, height, rng, radius=None, attempts=30):
+    """Bridson's Poisson-disk sampling: no two points closer than radius.
+
+    Every active point draws `attempts` random candidates from the annulus
+    between radius and 2 * radius around it; the first one far enough
+    from every accepted point is accepted, and an active point with none
+    retires. A background grid with cells of radius/sqrt(2) holds at
+    most one point each, so a candidate only checks the 21 cells around
+    it. radius defaults to a spacing that leaves room for count points,
+    narrowed further in the rare case the area still fills up first; an
+    explicit radius gives fewer points when count of them do not fit.
+
+    With NumPy installed, fronts grow from many random seeds and the
+    candidates of a batch of active points are drawn and checked at once;
+    otherwise points are handled one at a time from a single seed. The two
+    paths give different (equally distributed) points for the same seed.
+    """
+    if count <= 0:
+        return [], []
+    fit = radius is None
+    if fit:
+        radius = math.sqrt(width * height / (count * POISSON_PACKING))
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    while True:
+        if np is None:
+            xs, ys = _poisson_disk_python(count, width, height, rng, radius, attempts)
+        else:
+            xs, ys = _poisson_disk_numpy(np, count, width, height, rng, radius, attempts)
+        if len(xs) >= count or not fit:
+            return xs, ys
+        radius *= 0.9
+
+
+def _poisson_grid(width, height, radius):
+    """(cell size, columns, rows, neighbour offsets) of a padded sampling grid"""
+    cell = radius / math.sqrt(2)
+    # Two cells of padding on every side so neighbour lookups need no clamping
+    cols = int(width / cell) + 5
+    rows = int(height / cell) + 5
+    # The 5x5 block around a cell minus its corners, which are always too far
+    neighbours = [row * cols + col for row in range(-2, 3) for col in range(-2, 3)
+                  if abs(row) + abs(col) < 4]
+    return cell, cols, rows, neighbours
+
+
+def _poisson_disk_python(count, width, height, rng, radius, attempts):
+    r2 = radius * radius
+    cell, cols, rows, neighbours = _poisson_grid(width, height, radius)
+    grid = [-1] * (cols * rows)
+    xs, ys = [], []
+
+    def fits(x, y):
+        base = (int(y / cell) + 2) * cols + int(x / cell) + 2
+        for offset in neighbours:
+            k = grid[base + offset]
+            if k >= 0 and (xs[k] - x)**2 + (ys[k] - y)**2 < r2:
+                return False
+        return True
+
+    def add(x, y):
+        grid[(int(y / cell) + 2) * cols + int(x / cell) + 2] = len(xs)
+        xs.append(x)
+        ys.append(y)
+        active.append(len(xs) - 1)
+
+    active = []
+    add(rng.random() * width, rng.random() * height)
+    while active and len(xs) < count:
+        slot = rng.randrange(len(active))
+        k = active[slot]
+        for _ in range(attempts):
+            # Uniform over the annulus area
+            distance = math.sqrt(r2 * (1 + 3 * rng.random()))
+            angle = math.tau * rng.random()
+            x = xs[k] + distance * math.cos(angle)
+            y = ys[k] + distance * math.sin(angle)
+            if 0 <= x < width and 0 <= y < height and fits(x, y):
+                add(x, y)
+                break
+        else:
+            # Nothing fits around this point any more
+            active[slot] = active[-1]
+            active.pop()
+    return xs, ys
+
+
+def _poisson_disk_numpy(np, count, width, height, rng, radius, attempts, batch=1024):
+    gen = np.random.default_rng(rng.getrandbits(64))
+    r2 = radius * radius
+    cell, cols, rows, neighbours = _poisson_grid(width, height, radius)
+    neighbours = np.array(neighbours)
+    grid = np.full(cols * rows, -1, dtype=np.int32)
+    scratch = np.full(cols * rows, -1, dtype=np.int32)  # Cells of one batch's points
+    xs = np.empty(count)
+    ys = np.empty(count)
+    # Candidates are tried in rounds: most sources that can still grow
+    # succeed within the first few, so only the rest pay for all attempts
+    cuts = [min(2, attempts), min(10, attempts), attempts]
+    rounds = list(zip([0] + cuts[:-1], cuts))
+
+    def cells(x, y):
+        return (y / cell).astype(np.intp) * cols + (x / cell).astype(np.intp) + 2 * cols + 2
+
+    def clear(cx, cy):
+        """Which candidates lie inside the area and clear of every accepted point"""
+        cand = np.flatnonzero((cx >= 0) & (cx < width) & (cy >= 0) & (cy < height))
+        home = cells(cx[cand], cy[cand])
+        # A point in the candidate's own cell is always too close
+        free = grid[home] < 0
+        cand = cand[free]
+        near = grid[home[free, None] + neighbours]
+        which, slot = np.nonzero(near >= 0)
+        k = near[which, slot]
+        dx = xs[k] - cx[cand][which]
+        dy = ys[k] - cy[cand][which]
+        crowded = which[dx * dx + dy * dy < r2]
+        good = np.ones(len(cand), dtype=bool)
+        good[crowded] = False
+        ok = np.zeros(len(cx), dtype=bool)
+        ok[cand[good]] = True
+        return ok
+
+    def apart(nx, ny):
+        """Which new points keep radius from every earlier one of the same batch"""
+        home = cells(nx, ny)
+        # Points sharing a cell always crowd each other: the first one stays
+        _, first = np.unique(home, return_index=True)
+        keep = np.zeros(len(nx), dtype=bool)
+        keep[first] = True
+        scratch[home[first]] = first
+        near = scratch[home[:, None] + neighbours]
+        scratch[home[first]] = -1
+        which, slot = np.nonzero(near >= 0)
+        k = near[which, slot]
+        earlier = k < which
+        which, k = which[earlier], k[earlier]
+        dx = nx[k] - nx[which]
+        dy = ny[k] - ny[which]
+        keep[which[dx * dx + dy * dy < r2]] = False
+        return keep
+
+    # Seed with random darts, about one per 16 r^2, so many fronts grow at
+    # once and a batch rarely picks neighbouring sources
+    darts = max(1, min(count, int(width * height / (16 * r2))))
+    sx = gen.random(darts) * width
+    sy = gen.random(darts) * height
+    keep = apart(sx, sy)
+    n = int(keep.sum())
+    xs[:n] = sx[keep]
+    ys[:n] = sy[keep]
+    grid[cells(xs[:n], ys[:n])] = np.arange(n)
+    active = np.arange(n)
+    while len(active) and n < count:
+        # A random batch of active points, each drawing candidates uniformly
+        # from the annulus between radius and 2 * radius around it
+        pick = gen.choice(len(active), size=min(batch, len(active)), replace=False)
+        sources = active[pick]
+        found = np.zeros(len(sources), dtype=bool)
+        nx = np.empty(len(sources))
+        ny = np.empty(len(sources))
+        pending = np.arange(len(sources))
+        for first, last in rounds:
+            if not len(pending) or first == last:
+                continue
+            shape = (len(pending), last - first)
+            distance = np.sqrt(r2 * (1 + 3 * gen.random(shape)))
+            angle = 2 * np.pi * gen.random(shape)
+            cx = xs[sources[pending], None] + distance * np.cos(angle)
+            cy = ys[sources[pending], None] + distance * np.sin(angle)
+            ok = clear(cx.ravel(), cy.ravel()).reshape(shape)
+            # The first good candidate of each source
+            hit = ok.any(axis=1)
+            hits = np.flatnonzero(hit)
+            col = ok[hits].argmax(axis=1)
+            nx[pending[hits]] = cx[hits, col]
+            ny[pending[hits]] = cy[hits, col]
+            found[pending[hits]] = True
+            pending = pending[~hit]
+
+        # Candidates of one batch may crowd each other: drop any that is too
+        # close to an earlier one, and let its source try again later
+        nx = nx[found]
+        ny = ny[found]
+        keep = apart(nx, ny)
+        nx = nx[keep][:count - n]
+        ny = ny[keep][:count - n]
+
+        new = np.arange(n, n + len(nx))
+        xs[new] = nx
+        ys[new] = ny
+        grid[cells(nx, ny)] = new
+        n += len(nx)
+        # Sources with no good candidate retire
+        retired = np.zeros(len(active), dtype=bool)
+        retired[pick[~found]] = True
+        active = np.concatenate((active[~retired], new))
+    return xs[:n].tolist(), ys[:n].tolist()
+
+
+LAYOUTS = {
+    "poisson": poisson_disk,
+    "uniform": uniform,
+    "clusters": gaussian_clusters,
+    "adversarial": adversarial,
+}
+
+
+def generate(layout, count, width, height, seed=None, **options):
+    """Points of the named layout; the same seed always gives the same points"""
+    try:
+        generator = LAYOUTS[layout]
+    except KeyError:
+        raise ValueError(f"Unknown layout {layout!r}; "
+                         f"choose from {', '.join(LAYOUTS)}") from None
+    return generator(count, width, height, random.Random(seed), **options)
@@ -0,0 +1,104 @@
+"""Closest pair maintained incrementally as points come and go."""
+import math
+import random
+
+from spatial_grid import SpatialGrid
+
+
+class IncrementalClosestPair:
+    """Dynamic closest pair over keyed points.
+
+    Points are hashed into a SpatialGrid whose cell size is the current
+    minimum distance delta. No two points in a cell are closer than delta,
+    so every cell holds at most four points and an insertion only checks
+    the 3x3 cells around the new point. When a new point beats delta the
+    grid is rebuilt with the smaller cell size; for points arriving in
+    random order that happens O(log n) times in expectation, so insertion
+    costs expected O(1) amortized.
+
+    Removing a point that is not part of the closest pair is O(1). Removing
+    one that is forces a rebuild from the remaining points.
+    """
+    def __init__(self, seed=None):
+        self.points = {}
+        self.grid = None
+        self.min_distance = math.inf
+        self.closest_pair = (None, None)
+        self.rebuilds = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def clear(self):
+        self.points = {}
+        self.grid = None
+        self.min_distance = math.inf
+        self.closest_pair = (None, None)
+
+    def insert(self, key, x, y):
+        """Add a point; returns True if the closest pair changed"""
+        if key in self.points:
+            raise KeyError(f"point {key!r} is already present")
+        self.points[key] = (x, y)
+
+        if self.grid is None:
+            if len(self.points) < 2:
+                return False
+            # Second point: the only pair defines the first delta
+            (k1, (x1, y1)), (k2, (x2, y2)) = self.points.items()
+            self.min_distance = math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+            self.closest_pair = (k1, k2)
+            self._rebuild_grid()
+            return True
+
+        best_d2 = self.min_distance * self.min_distance
+        best_key = None
+        for other, px, py in self.grid.neighbors(x, y):
+            d2 = (px - x)**2 + (py - y)**2
+            if d2 < best_d2:
+                best_d2 = d2
+                best_key = other
+
+        if best_key is None:
+            self.grid.insert(key, x, y)
+            return False
+
+        self.min_distance = math.sqrt(best_d2)
+        self.closest_pair = (best_key, key)
+        if self.min_distance > 0:
+            self._rebuild_grid()
+        else:
+            # Duplicates: delta cannot shrink further, keep the old cells
+            self.grid.insert(key, x, y)
+        return True
+
+    def remove(self, key):
+        """Delete a point; returns True if the closest pair changed"""
+        x, y = self.points.pop(key)
+
+        if key not in self.closest_pair:
+            if self.grid is not None:
+                self.grid.remove(key, x, y)
+            return False
+
+        # The pair is gone: re-insert the survivors in random order
+        remaining = list(self.points.items())
+        self._rng.shuffle(remaining)
+        self.clear()
+        for other, (px, py) in remaining:
+            self.insert(other, px, py)
+        return True
+
+    def _rebuild_grid(self):
+        self.rebuilds += 1
+        if self.min_distance > 0:
+            cell_size = self.min_distance
+        else:
+            cell_size = self.grid.cell_size if self.grid is not None else 1.0
+        self.grid = SpatialGrid(cell_size)
+        for key, (x, y) in self.points.items():
+            self.grid.insert(key, x, y)
@@ -0,0 +1,364 @@
+"""Static 2-d tree over coordinate columns for nearest-neighbour queries.
+
+Nodes split their points at the median, on x and y in turn, down to
+leaves of up to leaf_size points. The tree is stored as flat per-node
+lists. Points are permuted so every node owns a contiguous range of
+them, and every node keeps the bounding box of its points, which is
+what queries prune on. Bulk loading sorts by each coordinate once and
+then does linear work per level (about 8s for a million points).
+
+DynamicKDTree adds insertion by keeping a few static trees of doubling
+sizes (the logarithmic method) and merging them as points arrive.
+"""
+import heapq
+import math
+
+
+class KDTree:
+    def __init__(self, xs, ys, leaf_size=16):
+        n = len(xs)
+        self.leaf_size = leaf_size
+        self.order = list(range(n))  # tree position -> original index
+        self.px = list(xs)  # coordinates in tree order
+        self.py = list(ys)
+
+        # Per node: point range, children (-1 for leaves) and bounding box
+        self.lo, self.hi = [], []
+        self.left, self.right = [], []
+        self.box = []
+        self.root = None
+        self._position = None  # index -> tree position, built on demand
+        if n:
+            self._build()
+
+    def __len__(self):
+        return len(self.order)
+
+    def _build(self):
+        # Median splits alternating x and y. Indices are sorted by each
+        # coordinate once; a split halves the list sorted on its axis and
+        # partitions the other list by side, so every level is linear.
+        xs, ys = self.px, self.py
+        n = len(xs)
+        by_x = sorted(range(n), key=xs.__getitem__)
+        by_y = sorted(range(n), key=ys.__getitem__)
+        # side[k] == depth + 1 once k went right at that depth: a point is in
+        # one node per depth, so the marks never need clearing
+        side = [0] * n
+        order = []
+        self.root = self._split(by_x, by_y, 0, side, order)
+        self.order = order
+        self.px = [xs[k] for k in order]
+        self.py = [ys[k] for k in order]
+
+    def _split(self, by_x, by_y, depth, side, order):
+        """Build the subtree of the given points; returns its node"""
+        if len(by_x) <= self.leaf_size:
+            leaf_xs = [self.px[k] for k in by_x]
+            leaf_ys = [self.py[k] for k in by_x]
+            node = self._add_node(len(order), len(order) + len(by_x), -1, -1,
+                                  (min(leaf_xs), max(leaf_xs), min(leaf_ys), max(leaf_ys)))
+            order.extend(by_x)
+            return node
+
+        # Split at the median of the axis; the other list keeps its order
+        primary, other = (by_x, by_y) if depth % 2 == 0 else (by_y, by_x)
+        mid = len(primary) // 2
+        mark = depth + 1
+        for k in primary[mid:]:
+            side[k] = mark
+        halves = [(primary[:mid], [k for k in other if side[k] != mark]),
+                  (primary[mid:], [k for k in other if side[k] == mark])]
+        if depth % 2:
+            halves = [half[::-1] for half in halves]
+
+        node = self._add_node(len(order), None, None, None, None)
+        a = self._split(*halves[0], depth + 1, side, order)
+        b = self._split(*halves[1], depth + 1, side, order)
+        box_a, box_b = self.box[a], self.box[b]
+        self.hi[node] = len(order)
+        self.left[node], self.right[node] = a, b
+        self.box[node] = (min(box_a[0], box_b[0]), max(box_a[1], box_b[1]),
+                          min(box_a[2], box_b[2]), max(box_a[3], box_b[3]))
+        return node
+
+    def _add_node(self, lo, hi, left, right, box):
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.left.append(left)
+        self.right.append(right)
+        self.box.append(box)
+        return len(self.lo) - 1
+
+    def _box_distance2(self, node, x, y):
+        min_x, max_x, min_y, max_y = self.box[node]
+        dx = min_x - x if x < min_x else (x - max_x if x > max_x else 0.0)
+        dy = min_y - y if y < min_y else (y - max_y if y > max_y else 0.0)
+        return dx * dx + dy * dy
+
+    def nearest2(self, x, y, bound=math.inf, exclude=None):
+        """(squared distance, index) of the point nearest to (x, y).
+
+        Only points strictly closer than sqrt(bound) are considered, and
+        not the point with index exclude; returns (bound, None) if there
+        is none.
+        """
+        best, best_k = bound, None
+        if not self.lo:
+            return best, best_k
+        px, py, left, right = self.px, self.py, self.left, self.right
+        box_distance2 = self._box_distance2
+        # Entries carry the box distance computed when they were pushed
+        stack = [(box_distance2(self.root, x, y), self.root)]
+        while stack:
+            d2, node = stack.pop()
+            if d2 >= best:
+                continue
+            a = left[node]
+            if a < 0:
+                for k in range(self.lo[node], self.hi[node]):
+                    d2 = (px[k] - x)**2 + (py[k] - y)**2
+                    if d2 < best and self.order[k] != exclude:
+                        best, best_k = d2, k
+                continue
+            b = right[node]
+            da = box_distance2(a, x, y)
+            db = box_distance2(b, x, y)
+            # Visit the nearer child first: push it last
+            if da <= db:
+                if db < best:
+                    stack.append((db, b))
+                stack.append((da, a))
+            else:
+                if da < best:
+                    stack.append((da, a))
+                stack.append((db, b))
+        return best, (self.order[best_k] if best_k is not None else None)
+
+    def nearest(self, x, y):
+        """(distance, index) of the point nearest to (x, y)"""
+        d2, index = self.nearest2(x, y)
+        return math.sqrt(d2), index
+
+    def nearest_many(self, xs, ys):
+        """nearest() for every query point, as a list in query order.
+
+        Each search starts bounded by the distance to the previous answer,
+        which prunes most of the tree when queries are spatially coherent.
+        """
+        results = []
+        prev = None
+        for x, y in zip(xs, ys):
+            bound = math.inf
+            if prev is not None:
+                bound = (self.px[prev] - x)**2 + (self.py[prev] - y)**2
+            d2, index = self.nearest2(x, y, bound)
+            if index is None:
+                index = self.order[prev] if prev is not None else None
+            else:
+                prev = self.position(index)
+            results.append((math.sqrt(d2), index))
+        return results
+
+    def point(self, index):
+        """(x, y) of the point with the given index"""
+        pos = self.position(index)
+        return self.px[pos], self.py[pos]
+
+    def position(self, index):
+        """Tree position of the point with the given index"""
+        if self._position is None:
+            self._position = [0] * len(self.order)
+            for pos, k in enumerate(self.order):
+                self._position[k] = pos
+        return self._position[index]
+
+    def knn2(self, x, y, k, bound=math.inf):
+        """Up to k (squared distance, index) pairs nearest to (x, y), closest first.
+
+        Points at least sqrt(bound) away are ignored.
+        """
+        heap = []  # (-d2, position): the worst kept neighbour on top
+        if not self.lo or k <= 0:
+            return heap
+        px, py, left, right = self.px, self.py, self.left, self.right
+        box_distance2 = self._box_distance2
+        stack = [(box_distance2(self.root, x, y), self.root)]
+        while stack:
+            d2, node = stack.pop()
+            if d2 >= bound:
+                continue
+            a = left[node]
+            if a < 0:
+                for pos in range(self.lo[node], self.hi[node]):
+                    d2 = (px[pos] - x)**2 + (py[pos] - y)**2
+                    if d2 < bound:
+                        if len(heap) < k:
+                            heapq.heappush(heap, (-d2, pos))
+                        else:
+                            heapq.heapreplace(heap, (-d2, pos))
+                        if len(heap) == k:
+                            bound = -heap[0][0]
+                continue
+            b = right[node]
+            da = box_distance2(a, x, y)
+            db = box_distance2(b, x, y)
+            if da <= db:
+                if db < bound:
+                    stack.append((db, b))
+                stack.append((da, a))
+            else:
+                if da < bound:
+                    stack.append((da, a))
+                stack.append((db, b))
+        return sorted((-neg, self.order[pos]) for neg, pos in heap)
+
+    def knn(self, x, y, k):
+        """The k points nearest to (x, y) as (distance, index), closest first"""
+        return [(math.sqrt(d2), index) for d2, index in self.knn2(x, y, k)]
+
+    def knn_many(self, xs, ys, k):
+        """knn() for every query point, as a list in query order.
+
+        Like nearest_many, each search is bounded by the previous answer:
+        its k points are k candidates, so the farthest of them from the
+        new query bounds the k-th nearest distance.
+        """
+        return _knn_many(self, xs, ys, k, self.point)
+
+
+class DynamicKDTree:
+    """KDTree that also accepts insertions.
+
+    New points collect in a small buffer that is scanned directly; when it
+    fills it is merged with every static tree no larger than itself into a
+    new tree, like carries in a binary counter. Inserts cost amortized
+    O(log^2 n) and a query visits O(log n) trees.
+    """
+    def __init__(self, xs=(), ys=(), leaf_size=16):
+        self.leaf_size = leaf_size
+        self.xs = list(xs)
+        self.ys = list(ys)
+        self.trees = []  # (KDTree, indices), largest first
+        self.buffer = []
+        if self.xs:
+            self._add_tree(list(range(len(self.xs))))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _add_tree(self, indices):
+        tree = KDTree([self.xs[k] for k in indices], [self.ys[k] for k in indices],
+                      self.leaf_size)
+        self.trees.append((tree, indices))
+
+    def insert(self, x, y):
+        """Add a point and return its index"""
+        index = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.buffer.append(index)
+        if len(self.buffer) >= self.leaf_size:
+            indices = self.buffer
+            self.buffer = []
+            while self.trees and len(self.trees[-1][1]) <= len(indices):
+                indices = self.trees.pop()[1] + indices
+            self._add_tree(indices)
+        return index
+
+    def clear(self):
+        self.xs = []
+        self.ys = []
+        self.trees = []
+        self.buffer = []
+
+    def nearest2(self, x, y, bound=math.inf, exclude=None):
+        """(squared distance, index) of the nearest point; see KDTree.nearest2"""
+        best, best_index = bound, None
+        for k in self.buffer:
+            d2 = (self.xs[k] - x)**2 + (self.ys[k] - y)**2
+            if d2 < best and k != exclude:
+                best, best_index = d2, k
+        for tree, indices in self.trees:
+            d2, k = tree.nearest2(x, y, best)
+            if k is not None and indices[k] == exclude:
+                d2, k = tree.nearest2(x, y, best, exclude=k)
+            if k is not None:
+                best, best_index = d2, indices[k]
+        return best, best_index
+
+    def nearest(self, x, y):
+        """(distance, index) of the point nearest to (x, y)"""
+        d2, index = self.nearest2(x, y)
+        return math.sqrt(d2), index
+
+    def nearest_many(self, xs, ys):
+        """nearest() for every query point, bounded by the previous answer"""
+        results = []
+        prev = None
+        for x, y in zip(xs, ys):
+            bound = math.inf
+            if prev is not None:
+                bound = (self.xs[prev] - x)**2 + (self.ys[prev] - y)**2
+            d2, index = self.nearest2(x, y, bound)
+            if index is None:
+                index = prev
+            prev = index
+            results.append((math.sqrt(d2), index))
+        return results
+
+    def knn2(self, x, y, k, bound=math.inf):
+        """Up to k (squared distance, index) pairs nearest to (x, y); see KDTree.knn2"""
+        if k <= 0:
+            return []
+        found = sorted(d for d in (((self.xs[i] - x)**2 + (self.ys[i] - y)**2, i)
+                                   for i in self.buffer) if d[0] < bound)[:k]
+        for tree, indices in self.trees:
+            if len(found) == k:
+                bound = found[-1][0]
+            found = sorted(found + [(d2, indices[i]) for d2, i in tree.knn2(x, y, k, bound)])[:k]
+        return found
+
+    def knn(self, x, y, k):
+        """The k points nearest to (x, y) as (distance, index), closest first"""
+        return [(math.sqrt(d2), index) for d2, index in self.knn2(x, y, k)]
+
+    def knn_many(self, xs, ys, k):
+        """knn() for every query point, bounded by the previous answer as in KDTree"""
+        return _knn_many(self, xs, ys, k, lambda index: (self.xs[index], self.ys[index]))
+
+
+def _knn_many(tree, xs, ys, k, point):
+    """Coherent k-NN queries on tree; point(index) gives an answer's coordinates.
+
+    The search bound is just above the farthest previous neighbour, so
+    those neighbours stay eligible and a full k are always found.
+    """
+    results = []
+    prev = []
+    for x, y in zip(xs, ys):
+        bound = math.inf
+        if len(prev) == k:
+            far = max((px - x)**2 + (py - y)**2 for px, py in map(point, prev))
+            bound = math.nextafter(far, math.inf)
+        found = tree.knn2(x, y, k, bound)
+        prev = [index for _, index in found]
+        results.append([(math.sqrt(d2), index) for d2, index in found])
+    return results
+
+
+def closest_pair_kdtree(xs, ys):
+    """Closest pair by querying every point's nearest neighbour in a KDTree.
+
+    Each query is bounded by the best distance so far. Returns
+    (min_dist, (i, j)).
+    """
+    tree = KDTree(xs, ys)
+    best, closest = math.inf, (None, None)
+    for i in range(len(xs)):
+        d2, j = tree.nearest2(xs[i], ys[i], best, exclude=i)
+        if j is not None:
+            best, closest = d2, (min(i, j), max(i, j))
+            if best == 0:
+                break
+    return math.sqrt(best), closest
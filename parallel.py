@@ -0,0 +1,183 @@
+"""Process-pool divide & conquer for multi-core machines.
+
+The top cutoff_depth levels of the recursion are split off in the parent:
+each of the 2**cutoff_depth x-ordered blocks is solved by a worker process,
+and the parent merges neighbouring blocks back together with the usual
+strip check. Coordinates are passed through one shared memory segment
+(x column then y column, sorted by x), so workers receive only offsets and
+nothing is pickled but the results.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from closest_pair import closest_pair_indices
+
+
+def _solve_block(shm_name, n, lo, hi):
+    """Worker: (squared distance, pair) of x-sorted positions [lo, hi) in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast('d')
+        xs = view[lo:hi].tolist()
+        ys = view[n + lo:n + hi].tolist()
+        view.release()
+    finally:
+        shm.close()
+
+    best_d2, (i, j) = closest_pair_indices(xs, ys, squared=True)
+    if i is None:
+        return best_d2, (None, None)
+    return best_d2, (lo + i, lo + j)
+
+
+def _split(lo, hi, depth):
+    """Leaf ranges of the recursion tree cut at the given depth"""
+    if depth == 0 or hi - lo <= 3:
+        return [(lo, hi)]
+    mid = (lo + hi) // 2
+    return _split(lo, mid, depth - 1) + _split(mid, hi, depth - 1)
+
+
+def _merge(xs, ys, lo, mid, hi, left, right):
+    """Combine two solved neighbouring ranges with a strip check.
+
+    Results are (squared distance, pair), so merging takes no sqrt.
+    """
+    best_d2, closest = left if left[0] < right[0] else right
+    mid_x = xs[mid]
+
+    # x-sorted, so the strip is one contiguous range around mid
+    start = mid
+    while start > lo and (mid_x - xs[start - 1])**2 < best_d2:
+        start -= 1
+    end = mid
+    while end < hi and (xs[end] - mid_x)**2 < best_d2:
+        end += 1
+    strip = sorted(range(start, end), key=ys.__getitem__)
+
+    i = 0
+    while i < len(strip):
+        j = i + 1
+        while j < len(strip) and j < i + 8:
+            dy = ys[strip[j]] - ys[strip[i]]
+            if dy * dy >= best_d2:
+                break
+            dx = xs[strip[j]] - xs[strip[i]]
+            d2 = dx * dx + dy * dy
+            if d2 < best_d2:
+                best_d2 = d2
+                closest = (strip[i], strip[j])
+            j += 1
+        i += 1
+    return best_d2, closest
+
+
+def default_cutoff_depth(workers):
+    """Smallest depth that gives every worker at least one block"""
+    return max(1, math.ceil(math.log2(workers)))
+
+
+def closest_pair_parallel(xs, ys, workers=None, cutoff_depth=None, executor=None):
+    """Divide & conquer with the top levels solved in worker processes.
+
+    workers defaults to the CPU count and cutoff_depth to the smallest
+    depth giving at least one block per worker. An existing executor can
+    be passed to reuse its processes. Returns (min_dist, (i, j)).
+    """
+    n = len(xs)
+    if n < 2:
+        return float('inf'), (None, None)
+
+    workers = workers or os.cpu_count() or 1
+    if cutoff_depth is None:
+        cutoff_depth = default_cutoff_depth(workers)
+
+    order = sorted(range(n), key=xs.__getitem__)
+    sorted_xs = array('d', (xs[k] for k in order))
+    sorted_ys = array('d', (ys[k] for k in order))
+
+    shm = shared_memory.SharedMemory(create=True, size=16 * n)
+    try:
+        view = shm.buf.cast('d')
+        view[:n] = sorted_xs
+        view[n:] = sorted_ys
+        view.release()
+
+        blocks = _split(0, n, cutoff_depth)
+        own_pool = executor is None
+        pool = ProcessPoolExecutor(max_workers=workers) if own_pool else executor
+        try:
+            futures = [pool.submit(_solve_block, shm.name, n, lo, hi)
+                       for lo, hi in blocks]
+            results = {block: future.result() for block, future in zip(blocks, futures)}
+        finally:
+            if own_pool:
+                pool.shutdown()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    def combine(lo, hi):
+        if (lo, hi) in results:
+            return results[(lo, hi)]
+        mid = (lo + hi) // 2
+        left = combine(lo, mid)
+        right = combine(mid, hi)
+        return _merge(sorted_xs, sorted_ys, lo, mid, hi, left, right)
+
+    best_d2, (i, j) = combine(0, n)
+    return math.sqrt(best_d2), (order[i], order[j])
+
+
+def parallel_speedup(xs, ys, workers=None, cutoff_depth=None):
+    """Time the parallel path against the serial solver.
+
+    Returns a dict with both timings, the speedup and whether the two
+    distances agree.
+    """
+    workers = workers or os.cpu_count() or 1
+    if cutoff_depth is None:
+        cutoff_depth = default_cutoff_depth(workers)
+
+    start = time.perf_counter()
+    serial_dist, _ = closest_pair_indices(xs, ys)
+    serial_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    parallel_dist, _ = closest_pair_parallel(xs, ys, workers, cutoff_depth)
+    parallel_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "n": len(xs),
+        "workers": workers,
+        "cutoff_depth": cutoff_depth,
+        "serial_ms": serial_ms,
+        "parallel_ms": parallel_ms,
+        "speedup": serial_ms / parallel_ms if parallel_ms else None,
+        "match": serial_dist == parallel_dist,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parallel and serial closest pair")
+    parser.add_argument("-n", type=int, default=200000, help="number of random points")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=None, help="recursion cutoff depth")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    xs = [rng.random() for _ in range(args.n)]
+    ys = [rng.random() for _ in range(args.n)]
+    print(json.dumps(parallel_speedup(xs, ys, args.workers, args.depth)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Memory-mapped binary point files for inputs larger than RAM.
+
+Layout (little-endian):
+
+    0   8s  magic b"CPPOINTS"
+    8   I   format version (1)
+    12  I   flags (FLAG_SORTED_X: points are in ascending x order)
+    16  Q   point count n
+    24      zero padding up to HEADER_SIZE (64) bytes
+    64      n float64 x, then n float64 y, then n int64 ids
+
+Opening a file only maps it, so load time does not depend on its size.
+Unsorted files are solved by an external sort by x (sorted runs merged
+from disk) followed by a sweep over x-ordered slabs: each slab is solved
+in memory and slab boundaries are stitched with the usual strip check.
+
+    python point_file.py random points.pts -n 100000000
+    python point_file.py solve points.pts
+"""
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from closest_pair import closest_pair_indices
+
+MAGIC = b"CPPOINTS"
+VERSION = 1
+FLAG_SORTED_X = 1
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+
+# Points held in memory at once by the sort and the slab sweep
+DEFAULT_CHUNK = 1 << 21
+
+
+def check_byteorder(kind="point files"):
+    """Raise OSError on big-endian platforms; kind names the files in the message"""
+    if sys.byteorder != "little":
+        raise OSError(f"{kind} are little-endian; this platform is not supported")
+
+
+def create_point_file(path, n, flags=0):
+    """Create a zero-filled file for n points; returns an open PointFile"""
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(HEADER_SIZE + 24 * n)
+    return PointFile(path, writable=True)
+
+
+def write_point_file(path, xs, ys, ids=None, sorted_x=False):
+    """Write coordinate columns (and optional ids, default 0..n-1) to path"""
+    n = len(xs)
+    with create_point_file(path, n, FLAG_SORTED_X if sorted_x else 0) as out:
+        if n:
+            out.xs[:] = array('d', xs)
+            out.ys[:] = array('d', ys)
+            out.ids[:] = array('q', range(n) if ids is None else ids)
+
+
+class PointFile:
+    """A mapped point file whose xs, ys and ids are zero-copy memoryviews"""
+    def __init__(self, path, writable=False):
+        check_byteorder()
+        self.path = path
+        self._file = open(path, "r+b" if writable else "rb")
+        magic, version, self.flags, self.n = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path}: not a point file")
+        if version != VERSION:
+            self._file.close()
+            raise ValueError(f"{path}: unsupported point file version {version}")
+
+        size = HEADER_SIZE + 24 * self.n
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), size, access=access)
+        view = memoryview(self._map)
+        end_x = HEADER_SIZE + 8 * self.n
+        end_y = end_x + 8 * self.n
+        self.xs = view[HEADER_SIZE:end_x].cast('d')
+        self.ys = view[end_x:end_y].cast('d')
+        self.ids = view[end_y:size].cast('q')
+        view.release()
+
+    def __len__(self):
+        return self.n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def sorted_x(self):
+        return bool(self.flags & FLAG_SORTED_X)
+
+    def to_numpy(self):
+        """(xs, ys, ids) NumPy views onto the mapping, no copy (needs NumPy)"""
+        import numpy as np
+        xs = np.frombuffer(self._map, dtype="<f8", count=self.n, offset=HEADER_SIZE)
+        ys = np.frombuffer(self._map, dtype="<f8", count=self.n,
+                           offset=HEADER_SIZE + 8 * self.n)
+        ids = np.frombuffer(self._map, dtype="<i8", count=self.n,
+                            offset=HEADER_SIZE + 16 * self.n)
+        return xs, ys, ids
+
+    def close(self):
+        for column in (self.xs, self.ys, self.ids):
+            column.release()
+        self._map.close()
+        self._file.close()
+
+
+def _iter_points(points, chunk):
+    """(x, y, id) tuples of a PointFile, read chunk points at a time"""
+    for lo in range(0, len(points), chunk):
+        hi = min(lo + chunk, len(points))
+        yield from zip(points.xs[lo:hi].tolist(), points.ys[lo:hi].tolist(),
+                       points.ids[lo:hi].tolist())
+
+
+def sort_point_file(src, dst, chunk=DEFAULT_CHUNK, tmpdir=None):
+    """Write src sorted by x to dst, holding at most chunk points in memory.
+
+    Sorted runs of chunk points are written to temporary point files and
+    merged; ties in x keep their input order.
+    """
+    with PointFile(src) as points, tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        n = len(points)
+        runs = []
+        for lo in range(0, n, chunk):
+            hi = min(lo + chunk, n)
+            xs = points.xs[lo:hi].tolist()
+            order = sorted(range(hi - lo), key=xs.__getitem__)
+            ys = points.ys[lo:hi].tolist()
+            ids = points.ids[lo:hi].tolist()
+            run = os.path.join(workdir, f"run{len(runs)}.pts")
+            write_point_file(run, [xs[k] for k in order], [ys[k] for k in order],
+                             [ids[k] for k in order], sorted_x=True)
+            runs.append(run)
+
+        with create_point_file(dst, n, FLAG_SORTED_X) as out:
+            sources = [PointFile(run) for run in runs]
+            try:
+                # Each run gets an equal share of the read buffer
+                share = max(1, chunk // max(1, len(sources)))
+                merged = heapq.merge(*(_iter_points(s, share) for s in sources),
+                                     key=lambda p: p[0])
+                pos = 0
+                while pos < n:
+                    block = [next(merged) for _ in range(min(chunk, n - pos))]
+                    end = pos + len(block)
+                    out.xs[pos:end] = array('d', (p[0] for p in block))
+                    out.ys[pos:end] = array('d', (p[1] for p in block))
+                    out.ids[pos:end] = array('q', (p[2] for p in block))
+                    pos = end
+            finally:
+                for source in sources:
+                    source.close()
+
+
+def _stitch(tail, head, best_d2, closest):
+    """Strip check across a slab boundary; tail and head are (x, y, pos) lists.
+
+    Distances in and out are squared.
+    """
+    strip = sorted(tail + head, key=lambda p: p[1])
+    for i in range(len(strip)):
+        xi, yi, pi = strip[i]
+        for j in range(i + 1, min(i + 8, len(strip))):
+            xj, yj, pj = strip[j]
+            dy = yj - yi
+            if dy * dy >= best_d2:
+                break
+            dx = xj - xi
+            d2 = dx * dx + dy * dy
+            if d2 < best_d2:
+                best_d2 = d2
+                closest = (min(pi, pj), max(pi, pj))
+    return best_d2, closest
+
+
+def closest_pair_sorted(points, chunk=DEFAULT_CHUNK):
+    """Slab sweep over an x-sorted PointFile.
+
+    Returns (min_dist, (i, j)) with positions in the file; points.ids
+    maps them back to point ids.
+    """
+    n = len(points)
+    # Squared distances throughout; sqrt is taken once at the end
+    best_d2 = float('inf')
+    closest = (None, None)
+    tail = []  # Earlier points within best of the current boundary
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        xs = points.xs[lo:hi].tolist()
+        ys = points.ys[lo:hi].tolist()
+
+        d2, (i, j) = closest_pair_indices(xs, ys, squared=True)
+        if d2 < best_d2:
+            best_d2 = d2
+            closest = (lo + min(i, j), lo + max(i, j))
+
+        if tail:
+            boundary = xs[0]
+            tail = [p for p in tail if (boundary - p[0])**2 < best_d2]
+            head = []
+            for k in range(len(xs)):
+                if (xs[k] - boundary)**2 >= best_d2:
+                    break
+                head.append((xs[k], ys[k], lo + k))
+            best_d2, closest = _stitch(tail, head, best_d2, closest)
+
+        # Anything a later slab could still pair with lies within best of x[-1]
+        last = xs[-1]
+        tail = [p for p in tail if (last - p[0])**2 < best_d2]
+        k = len(xs) - 1
+        while k >= 0 and (last - xs[k])**2 < best_d2:
+            k -= 1
+        tail.extend((xs[m], ys[m], lo + m) for m in range(k + 1, len(xs)))
+
+    return math.sqrt(best_d2), closest
+
+
+def closest_pair_file(path, chunk=DEFAULT_CHUNK, tmpdir=None):
+    """Closest pair of a point file of any size; returns (min_dist, (id_i, id_j))
+
+    Files not flagged as x-sorted are externally sorted into a temporary
+    file first.
+    """
+    with PointFile(path) as points:
+        if points.sorted_x:
+            dist, (i, j) = closest_pair_sorted(points, chunk)
+            if i is None:
+                return dist, (None, None)
+            return dist, (points.ids[i], points.ids[j])
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        sorted_path = os.path.join(workdir, "sorted.pts")
+        sort_point_file(path, sorted_path, chunk, tmpdir)
+        return closest_pair_file(sorted_path, chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and solve binary point files")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    make = sub.add_parser("random", help="write uniformly random points")
+    make.add_argument("path")
+    make.add_argument("-n", type=int, default=1000000)
+    make.add_argument("--seed", type=int, default=0)
+
+    run = sub.add_parser("solve", help="closest pair of a point file")
+    run.add_argument("path")
+    run.add_argument("--chunk", type=int, default=DEFAULT_CHUNK,
+                     help="points held in memory at once")
+    run.add_argument("--tmpdir", default=None, help="where sorted runs are written")
+    args = parser.parse_args()
+
+    if args.command == "random":
+        rng = random.Random(args.seed)
+        with create_point_file(args.path, args.n) as out:
+            for lo in range(0, args.n, DEFAULT_CHUNK):
+                hi = min(lo + DEFAULT_CHUNK, args.n)
+                out.xs[lo:hi] = array('d', (rng.random() for _ in range(hi - lo)))
+                out.ys[lo:hi] = array('d', (rng.random() for _ in range(hi - lo)))
+                out.ids[lo:hi] = array('q', range(lo, hi))
+        return
+
+    start = time.perf_counter()
+    dist, pair = closest_pair_file(args.path, args.chunk, args.tmpdir)
+    print(json.dumps({"path": args.path, "min_dist": dist, "pair": list(pair),
+                      "time_ms": (time.perf_counter() - start) * 1000}))
+
+
+if __name__ == "__main__":
+    main()
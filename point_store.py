@@ -0,0 +1,110 @@
+"""Compact struct-of-arrays point storage.
+
+Coordinates, ids and the A/B group live in typed ``array`` columns
+(25 bytes per point) instead of one object per point. EnhancedPoint
+views are only created on demand, e.g. for recorded visualization steps.
+"""
+from array import array
+
+from closest_pair import EnhancedPoint, solve
+
+# Point groups for bichromatic queries
+GROUP_A = 0
+GROUP_B = 1
+
+
+class PointStore:
+    def __init__(self):
+        self.xs = array('d')
+        self.ys = array('d')
+        self.ids = array('q')
+        self.groups = array('B')
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        """Materialize the point at index as an EnhancedPoint"""
+        return EnhancedPoint(self.xs[index], self.ys[index], self.ids[index])
+
+    def __iter__(self):
+        for i in range(len(self.xs)):
+            yield EnhancedPoint(self.xs[i], self.ys[i], self.ids[i])
+
+    def append(self, x, y, id, group=GROUP_A):
+        """Add a point and return its index"""
+        self.xs.append(x)
+        self.ys.append(y)
+        self.ids.append(id)
+        self.groups.append(group)
+        return len(self.xs) - 1
+
+    def extend(self, xs, ys, ids, groups=None):
+        count = len(self.xs)
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.ids.extend(ids)
+        if groups is None:
+            self.groups.extend(bytes(len(self.xs) - count))
+        else:
+            self.groups.extend(groups)
+
+    def clear(self):
+        self.xs = array('d')
+        self.ys = array('d')
+        self.ids = array('q')
+        self.groups = array('B')
+
+    def index_of(self, id):
+        """Index of the point with the given id, or None"""
+        try:
+            return self.ids.index(id)
+        except ValueError:
+            return None
+
+    def nbytes(self):
+        return (self.xs.itemsize * len(self.xs) + self.ys.itemsize * len(self.ys)
+                + self.ids.itemsize * len(self.ids) + self.groups.itemsize * len(self.groups))
+
+    def save(self, path):
+        """Write the points to a binary point file (see point_file); groups are not kept"""
+        from point_file import write_point_file
+        write_point_file(path, self.xs, self.ys, self.ids)
+
+    @classmethod
+    def load(cls, path):
+        """Read a binary point file into a new store"""
+        from point_file import PointFile
+        store = cls()
+        with PointFile(path) as points:
+            store.xs.frombytes(points.xs.tobytes())
+            store.ys.frombytes(points.ys.tobytes())
+            store.ids.frombytes(points.ids.tobytes())
+        store.groups.frombytes(bytes(len(store.xs)))
+        return store
+
+    def to_numpy(self):
+        """Copy the coordinates into an (N, 2) float64 array (needs NumPy)"""
+        import numpy as np
+        coords = np.empty((len(self.xs), 2), dtype=np.float64)
+        coords[:, 0] = self.xs
+        coords[:, 1] = self.ys
+        return coords
+
+    def closest_pair(self, algorithm="dc", stats=None):
+        """Solve on the stored columns; returns (min_dist, (i, j)) indices"""
+        return solve(self.xs, self.ys, algorithm, stats)
+
+    def bichromatic_closest_pair(self):
+        """Closest pair between groups A and B; returns (min_dist, (i, j)) with i in A"""
+        from queries import bichromatic_closest_pair
+        members = ([], [])
+        for index, group in enumerate(self.groups):
+            members[group].append(index)
+        a, b = members
+        min_dist, (i, j) = bichromatic_closest_pair(
+            [self.xs[k] for k in a], [self.ys[k] for k in a],
+            [self.xs[k] for k in b], [self.ys[k] for k in b])
+        if i is None:
+            return min_dist, (None, None)
+        return min_dist, (a[i], b[j])
@@ -0,0 +1,104 @@
+"""Memoized solver results and step traces, keyed by point-set fingerprints.
+
+A PointSetFingerprint is updated as points are added, so telling whether
+the set changed since the last solve costs nothing per solve. ResultCache
+is a small LRU map from such keys to results, bounded both in entries and
+in total size.
+"""
+from collections import OrderedDict
+
+MASK = (1 << 64) - 1
+
+
+def _mix(h):
+    """splitmix64 finalizer: spreads a hash over all 64 bits"""
+    h = (h + 0x9E3779B97F4A7C15) & MASK
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK
+    return h ^ (h >> 31)
+
+
+class PointSetFingerprint:
+    """Order-independent hash of a point set, updated one point at a time.
+
+    Each point's (id, x, y, group) is hashed and mixed, and the set hash is
+    the sum of those modulo 2**64: adding a point is O(1), and the same
+    points give the same fingerprint in any order. Hashes of numbers are
+    not randomized per process, so keys also agree across runs.
+    """
+    def __init__(self):
+        self.count = 0
+        self.value = 0
+
+    def add(self, id, x, y, group=0):
+        self.value = (self.value + _mix(hash((id, x, y, group)))) & MASK
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+        self.value = 0
+
+    @property
+    def key(self):
+        return self.count, self.value
+
+
+class ResultCache:
+    """LRU cache bounded in entries and in the total size of its values.
+
+    sizeof(value) gives an entry's size (1 each by default). A value that
+    keeps growing after it is cached, like a timeline still pulling steps,
+    is re-measured by calling resized(key) when it grows.
+    """
+    def __init__(self, max_entries=32, max_size=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """Cached value for key, marking it most recently used"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def resized(self, key):
+        """Re-account the value under key after it grew, evicting as needed"""
+        if key in self.entries:
+            self._evict()
+
+    def clear(self):
+        self.entries.clear()
+
+    def size(self):
+        if self.sizeof is None:
+            return len(self.entries)
+        return sum(self.sizeof(value) for value in self.entries.values())
+
+    def _evict(self):
+        # Least recently used first; a value too big on its own goes too
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if self.max_size is not None:
+            total = self.size()
+            while self.entries and total > self.max_size:
+                _, value = self.entries.popitem(last=False)
+                total -= self.sizeof(value) if self.sizeof else 1
@@ -0,0 +1,90 @@
+"""Uniform-grid spatial hash for fixed-radius proximity queries."""
+import math
+
+
+class SpatialGrid:
+    """Hash point indices into square cells of side cell_size.
+
+    A query with radius <= cell_size only has to look at the 3x3 block of
+    cells around the query point, so checks cost O(1) for spaced points
+    instead of a scan over every point.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def __len__(self):
+        return sum(len(cell) for cell in self.cells.values())
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, index, x, y):
+        self.cells.setdefault(self.cell_of(x, y), []).append((index, x, y))
+
+    def remove(self, index, x, y):
+        key = self.cell_of(x, y)
+        cell = self.cells.get(key, [])
+        for k, entry in enumerate(cell):
+            if entry[0] == index:
+                del cell[k]
+                break
+        if not cell:
+            self.cells.pop(key, None)
+
+    def clear(self):
+        self.cells = {}
+
+    def neighbors(self, x, y):
+        """Yield (index, x, y) for every point in the 3x3 cells around (x, y)"""
+        cx, cy = self.cell_of(x, y)
+        for gx in range(cx - 1, cx + 2):
+            for gy in range(cy - 1, cy + 2):
+                cell = self.cells.get((gx, gy))
+                if cell:
+                    yield from cell
+
+    def nearest(self, x, y):
+        """(distance, index) of the point nearest to (x, y); (inf, None) if empty
+
+        Rings of cells are searched outward until the next ring cannot hold
+        anything nearer; once a ring would cover more cells than are
+        occupied, the occupied cells are scanned instead.
+        """
+        best, best_index = math.inf, None
+        cx, cy = self.cell_of(x, y)
+        ring = 0
+        while self.cells:
+            side = 2 * ring + 1
+            if side * side > len(self.cells):
+                cells = self.cells.values()
+            elif ring == 0:
+                cells = [self.cells.get((cx, cy))]
+            else:
+                cells = [self.cells.get((gx, gy))
+                         for gx in range(cx - ring, cx + ring + 1)
+                         for gy in (cy - ring, cy + ring)]
+                cells += [self.cells.get((gx, gy))
+                          for gx in (cx - ring, cx + ring)
+                          for gy in range(cy - ring + 1, cy + ring)]
+            for cell in cells:
+                for index, px, py in cell or ():
+                    d2 = (px - x)**2 + (py - y)**2
+                    if d2 < best:
+                        best, best_index = d2, index
+            # Anything outside the rings searched is at least ring * cell_size away
+            if side * side > len(self.cells) or best <= (ring * self.cell_size)**2:
+                break
+            ring += 1
+        return math.sqrt(best), best_index
+
+    def find_within(self, x, y, radius):
+        """Index of some point closer than radius to (x, y), or None
+
+        radius must not exceed cell_size.
+        """
+        r2 = radius * radius
+        for index, px, py in self.neighbors(x, y):
+            if (px - x)**2 + (py - y)**2 < r2:
+                return index
+        return None
@@ -0,0 +1,102 @@
+"""Seekable timeline of visualization steps."""
+
+# Steps that leave something on the canvas until the run ends
+LAYER_OF_STEP = {
+    "divide": "dividers",
+    "strip": "strips",
+    "result": "pairs",
+    "final": "pairs",
+}
+LAYERS = ("dividers", "strips", "pairs")
+
+# Average memory of one pulled step: its dict plus its log and checkpoint
+# entries (measured at about 300 bytes)
+STEP_BYTES = 300
+
+
+class StepTimeline:
+    """Played steps plus periodic checkpoints of the canvas state.
+
+    Division lines, strips and best-pair lines only accumulate while the
+    algorithm runs, so the canvas after step t is a prefix of three
+    append-only logs (dividers, strips, pairs) holding step indices. Every
+    `interval` steps a checkpoint records the log lengths; the state at any
+    step is the nearest earlier checkpoint plus at most `interval` replayed
+    steps.
+
+    Steps are pulled lazily from `source`, an iterator, as they are needed.
+    Alternatively `steps` can be a sequence that already holds every step,
+    such as a TraceReader; steps are then read from it on demand instead
+    of being copied, and only the logs and checkpoints are kept here.
+    """
+    def __init__(self, source=None, interval=64, steps=None):
+        self.source = source
+        self.interval = interval
+        self.steps = [] if steps is None else steps
+        self.count = 0  # Steps seen so far: fetched, and in the logs
+        self.logs = {layer: [] for layer in LAYERS}
+        self.checkpoints = [(0, 0, 0)]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    def nbytes(self):
+        """Estimated memory held for the steps pulled so far, in bytes"""
+        if isinstance(self.steps, list):
+            return len(self.steps) * STEP_BYTES
+        # Steps stay in their own sequence, e.g. a mapped trace; only logs are here
+        return 8 * (sum(len(log) for log in self.logs.values()) + 3 * len(self.checkpoints))
+
+    @property
+    def finished(self):
+        return self.source is None and self.count == len(self.steps)
+
+    def fetch(self, index):
+        """Step at index, pulling from the source as needed; None past the end"""
+        while index >= self.count:
+            if self.count < len(self.steps):
+                self._record(self.steps[self.count])
+                continue
+            if self.source is None:
+                break
+            step = next(self.source, None)
+            if step is None:
+                self.source = None
+            else:
+                self.steps.append(step)
+                self._record(step)
+        return self.steps[index] if index < self.count else None
+
+    def _record(self, step):
+        index = self.count
+        self.count += 1
+        layer = self._layer(step)
+        if layer:
+            self.logs[layer].append(index)
+        if self.count % self.interval == 0:
+            self.checkpoints.append(tuple(len(self.logs[name]) for name in LAYERS))
+
+    @staticmethod
+    def _layer(step):
+        layer = LAYER_OF_STEP.get(step["type"])
+        if layer == "pairs" and step["closest_pair"][0] is None:
+            return None
+        return layer
+
+    def state_at(self, t):
+        """Log lengths (dividers, strips, pairs) after the first t steps"""
+        t = min(t, self.count)
+        base = t // self.interval
+        counts = dict(zip(LAYERS, self.checkpoints[base]))
+        for index in range(base * self.interval, t):
+            layer = self._layer(self.steps[index])
+            if layer:
+                counts[layer] += 1
+        return tuple(counts[name] for name in LAYERS)
+
+    def entry(self, layer, k):
+        """Step that produced the k-th item of a layer"""
+        return self.steps[self.logs[layer][k]]
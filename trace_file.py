@@ -0,0 +1,314 @@
+"""Binary trace files of recorded visualization steps.
+
+Layout (little-endian):
+
+    0   8s  magic b"CPTRACE\\0"
+    8   I   format version (1)
+    12  I   point count n
+    16      zero padding up to HEADER_SIZE (32) bytes
+    32      point table: n float64 x, then n float64 y, then n int64 ids
+            step records, each an opcode byte, a depth byte, a side byte
+            and the fixed fields of that opcode (see RECORDS)
+            footer: one uint64 record offset per INDEX_INTERVAL steps
+    end-24  Q   step count, Q footer offset, 8s magic b"CPTREND\\0"
+
+Steps refer to points by their position in the point table and carry
+their distances as float64, so a trace holds no live objects and no
+text. Records are appended as steps are produced and the footer is
+written on close. A reader maps the file and decodes a step only when
+it is asked for, seeking from the nearest indexed record, so a trace of
+any length can be replayed without loading it.
+
+    python trace_file.py record trace.cpt --layout uniform -n 100000
+    python trace_file.py info trace.cpt
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from closest_pair import EnhancedPoint, iter_visualization_steps
+from point_file import check_byteorder
+
+MAGIC = b"CPTRACE\0"
+END_MAGIC = b"CPTREND\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+HEADER_SIZE = 32
+TRAILER = struct.Struct("<QQ8s")
+PREFIX = struct.Struct("<BBB")  # opcode, depth, side
+
+# Steps between footer index entries: a random access decodes at most this many
+INDEX_INTERVAL = 256
+
+# Steps between calls of record_trace's progress callback
+PROGRESS_INTERVAL = 65536
+
+# Point slot of a missing point, e.g. the pair of an empty result
+NO_POINT = 0xFFFFFFFF
+
+SIDES = ("", "L", "R")
+SIDE_CODES = {side: code for code, side in enumerate(SIDES)}
+
+# opcode: (step type, fields after the prefix, struct of those fields).
+# Point pairs pack into two point slots; a base case's points pack into
+# a count and three slots.
+RECORDS = {
+    0: ("start", ("count",), "<I"),
+    1: ("base_case", ("points",), "<B3I"),
+    2: ("compare", ("points", "distance"), "<IId"),
+    3: ("result", ("min_distance", "closest_pair", "settled"), "<dIII"),
+    4: ("divide", ("mid_x", "left_count", "right_count"), "<dII"),
+    5: ("combine", ("min_dist", "closest"), "<dII"),
+    6: ("strip", ("mid_x", "strip_width", "strip_count"), "<ddI"),
+    7: ("compare_strip", ("points", "distance"), "<IId"),
+    8: ("final", ("min_distance", "closest_pair"), "<dII"),
+    9: ("summary", ("min_distance", "closest_pair", "time_ms", "total_steps"), "<dIIdI"),
+}
+OPCODES = {kind: opcode for opcode, (kind, _, _) in RECORDS.items()}
+STRUCTS = {opcode: struct.Struct(fmt) for opcode, (_, _, fmt) in RECORDS.items()}
+# Whole record size by opcode, for skipping records without decoding them
+SIZES = {opcode: PREFIX.size + fields.size for opcode, fields in STRUCTS.items()}
+
+# Fields that hold point references rather than numbers
+POINT_FIELDS = {"points", "closest_pair", "closest"}
+
+
+class TraceWriter:
+    """Write steps for a list of points to a trace file, one record at a time.
+
+    points are the objects the steps refer to (the list passed to
+    iter_visualization_steps); they become the point table.
+    """
+    def __init__(self, path, points):
+        self.path = path
+        self._file = open(path, "wb")
+        self.count = 0
+        self.index = array('Q')
+        self._slot = {id(p): k for k, p in enumerate(points)}
+
+        n = len(points)
+        self._file.write(HEADER.pack(MAGIC, VERSION, n).ljust(HEADER_SIZE, b"\0"))
+        self._file.write(array('d', (p.x for p in points)).tobytes())
+        self._file.write(array('d', (p.y for p in points)).tobytes())
+        self._file.write(array('q', (p.id or 0 for p in points)).tobytes())
+        self._offset = HEADER_SIZE + 24 * n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave the footer out so readers reject the unfinished trace
+            self._file.close()
+
+    def _slots(self, points, width):
+        slots = [NO_POINT if p is None else self._slot[id(p)] for p in points]
+        return slots + [NO_POINT] * (width - len(slots))
+
+    def write(self, step):
+        """Append one step dict"""
+        opcode = OPCODES[step["type"]]
+        _, fields, _ = RECORDS[opcode]
+        values = []
+        for field in fields:
+            value = step[field]
+            if field == "points" and opcode == 1:
+                values.append(len(value))
+                values.extend(self._slots(value, 3))
+            elif field in POINT_FIELDS:
+                values.extend(self._slots(value, 2))
+            else:
+                values.append(value)
+
+        if self.count % INDEX_INTERVAL == 0:
+            self.index.append(self._offset)
+        record = (PREFIX.pack(opcode, min(step.get("depth", 0), 255),
+                              SIDE_CODES[step.get("side", "")])
+                  + STRUCTS[opcode].pack(*values))
+        self._file.write(record)
+        self._offset += len(record)
+        self.count += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write(self.index.tobytes())
+        self._file.write(TRAILER.pack(self.count, self._offset, END_MAGIC))
+        self._file.close()
+
+
+def record_trace(path, points, progress=None):
+    """Write the visualization steps of points (sorted by x) to path; returns the step count
+
+    progress(steps written) is called every PROGRESS_INTERVAL steps. If
+    recording fails or is interrupted, the partial file is removed.
+    """
+    try:
+        with TraceWriter(path, points) as trace:
+            for step in iter_visualization_steps(points):
+                trace.write(step)
+                if progress is not None and trace.count % PROGRESS_INTERVAL == 0:
+                    progress(trace.count)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return trace.count
+
+
+class TraceReader:
+    """A mapped trace file, indexable like a list of step dicts.
+
+    Steps and their points are decoded on access; nothing is cached apart
+    from the position of the last decoded record, which makes reading in
+    order cheap.
+    """
+    def __init__(self, path):
+        check_byteorder("trace files")
+        self.path = path
+        self._file = open(path, "rb")
+        size = self._file.seek(0, 2)
+        if size < HEADER_SIZE + TRAILER.size:
+            self._file.close()
+            raise ValueError(f"{path}: not a trace file")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n = HEADER.unpack_from(self._map, 0)
+        count, footer, end_magic = TRAILER.unpack_from(self._map, size - TRAILER.size)
+        if magic != MAGIC or end_magic != END_MAGIC:
+            self._map.close()
+            self._file.close()
+            raise ValueError(f"{path}: not a trace file (or it was not closed)")
+        if version != VERSION:
+            self._map.close()
+            self._file.close()
+            raise ValueError(f"{path}: unsupported trace file version {version}")
+
+        self.count = count
+        self.index = array('Q')
+        self.index.frombytes(self._map[footer:size - TRAILER.size])
+        end_x = HEADER_SIZE + 8 * self.n
+        end_y = end_x + 8 * self.n
+        view = memoryview(self._map)
+        self.xs = view[HEADER_SIZE:end_x].cast('d')
+        self.ys = view[end_x:end_y].cast('d')
+        self.ids = view[end_y:end_y + 8 * self.n].cast('q')
+        view.release()
+        self._cursor = (0, self.index[0] if self.index else footer)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, t):
+        if t < 0:
+            t += self.count
+        if not 0 <= t < self.count:
+            raise IndexError("step index out of range")
+        return self._decode(self._seek(t))
+
+    def __iter__(self):
+        for t in range(self.count):
+            yield self[t]
+
+    def point(self, k):
+        """Point slot k as an EnhancedPoint, or None for NO_POINT"""
+        if k == NO_POINT:
+            return None
+        return EnhancedPoint(self.xs[k], self.ys[k], self.ids[k])
+
+    def points(self):
+        """Every point of the table, in table order"""
+        return [self.point(k) for k in range(self.n)]
+
+    def _seek(self, t):
+        """Offset of record t, from the last position or the nearest index entry"""
+        last, offset = self._cursor
+        if not last <= t < last + INDEX_INTERVAL:
+            last = t - t % INDEX_INTERVAL
+            offset = self.index[last // INDEX_INTERVAL]
+        data = self._map
+        while last < t:
+            offset += SIZES[data[offset]]
+            last += 1
+        self._cursor = (t, offset)
+        return offset
+
+    def _decode(self, offset):
+        opcode, depth, side = PREFIX.unpack_from(self._map, offset)
+        kind, fields, _ = RECORDS[opcode]
+        values = STRUCTS[opcode].unpack_from(self._map, offset + PREFIX.size)
+        step = {"type": kind}
+        pos = 0
+        for field in fields:
+            if field == "points" and opcode == 1:
+                step["points"] = tuple(self.point(k) for k in values[1:1 + values[0]])
+                pos += 4
+            elif field in POINT_FIELDS:
+                step[field] = (self.point(values[pos]), self.point(values[pos + 1]))
+                pos += 2
+            else:
+                step[field] = values[pos]
+                pos += 1
+        if kind not in ("start", "summary"):
+            step["depth"] = depth
+            step["side"] = SIDES[side]
+        return step
+
+    def close(self):
+        for column in (self.xs, self.ys, self.ids):
+            column.release()
+        self._map.close()
+        self._file.close()
+
+
+def main():
+    from generators import LAYOUTS, generate
+
+    parser = argparse.ArgumentParser(description="Record and inspect visualization traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    make = sub.add_parser("record", help="record the steps of a generated point set")
+    make.add_argument("path")
+    make.add_argument("--layout", default="uniform", choices=list(LAYOUTS))
+    make.add_argument("-n", type=int, default=1000)
+    make.add_argument("--seed", type=int, default=0)
+    make.add_argument("--size", type=float, nargs=2, default=(700, 500),
+                      metavar=("WIDTH", "HEIGHT"))
+
+    info = sub.add_parser("info", help="summarize a trace file")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        xs, ys = generate(args.layout, args.n, args.size[0], args.size[1], args.seed)
+        points = sorted((EnhancedPoint(x, y, k + 1) for k, (x, y) in enumerate(zip(xs, ys))),
+                        key=lambda p: p.x)
+        start = time.perf_counter()
+        count = record_trace(args.path, points)
+        print(json.dumps({"path": args.path, "points": len(points), "steps": count,
+                          "time_ms": (time.perf_counter() - start) * 1000}))
+        return
+
+    with TraceReader(args.path) as trace:
+        summary = trace[len(trace) - 1] if len(trace) else None
+        print(json.dumps({
+            "path": args.path,
+            "points": trace.n,
+            "steps": len(trace),
+            "min_distance": summary["min_distance"] if summary else None,
+        }))
+
+
+if __name__ == "__main__":
+    main()